@@ -0,0 +1,205 @@
+import re
+import asyncio
+import asyncssh
+from logger import logger
+from replay_connection import record_outputs
+from transition_device import S4224
+from transition_device import LIB4424
+
+
+class AsyncSSHConnection():
+    """Sesion SSH interactiva sobre asyncssh.
+
+    Expone el subconjunto de la API de netmiko que usan los equipos
+    Transition (send_command, send_config_set, disconnect), pero como
+    corutinas, de forma que un unico event loop pueda manejar cientos de
+    sesiones sin un hilo por equipo.
+    """
+
+    PROMPT_PATTERN = re.compile(r'^\S+[#>]\s*$')
+
+    def __init__(self, host, username, password, timeout=30):
+        self.host = host
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.prompt = None
+        self._prompt_pattern = self.PROMPT_PATTERN
+        self._config_prompt_pattern = self.PROMPT_PATTERN
+        self._conn = None
+        self._process = None
+
+    async def connect(self):
+        self._conn = await asyncio.wait_for(
+            asyncssh.connect(
+                self.host,
+                username=self.username,
+                password=self.password,
+                known_hosts=None
+            ),
+            self.timeout
+        )
+        self._process = await self._conn.create_process(
+            term_type='vt100', term_size=(511, 24))
+
+        banner = await self._read_until_prompt()
+        self._set_prompt(banner.splitlines()[-1].strip())
+        # Deshabilitamos el paginado una unica vez por sesion.
+        await self.send_command("terminal length 0")
+
+    def _set_prompt(self, prompt):
+        # Con el prompt conocido se busca exactamente ese texto, como hace
+        # netmiko con expect_string, y no cualquier linea terminada en # o >
+        # que pueda aparecer en la salida de un comando. En modo
+        # configuracion el prompt cambia a "hostname(config-if)#".
+        self.prompt = prompt
+        base_prompt = re.escape(prompt[:-1])
+        self._prompt_pattern = re.compile(
+            r'^' + re.escape(prompt) + r'\s*$')
+        self._config_prompt_pattern = re.compile(
+            r'^' + base_prompt + r'(\([^)]*\))?[#>]\s*$')
+
+    async def _read_until_prompt(self, prompt_pattern=None):
+        prompt_pattern = prompt_pattern or self._prompt_pattern
+        output = ""
+        while True:
+            data = await asyncio.wait_for(
+                self._process.stdout.read(65535), self.timeout)
+            if not data:
+                raise ConnectionError(
+                    f"La sesion con el equipo {self.host} fue cerrada.")
+            output += data.replace('\r', '')
+            last_line = output.rsplit('\n', 1)[-1]
+            if prompt_pattern.match(last_line):
+                return output
+
+    async def send_command(self, command):
+        self._process.stdin.write(command + '\n')
+        output = await self._read_until_prompt()
+        lines = output.split('\n')
+        # Quitamos el eco del comando y el prompt final, igual que netmiko.
+        if lines and command in lines[0]:
+            del lines[0]
+        if lines and self._prompt_pattern.match(lines[-1]):
+            del lines[-1]
+        return '\n'.join(lines)
+
+    async def send_config_set(self, config_commands):
+        output = ""
+        for command in ["configure terminal"] + list(config_commands):
+            self._process.stdin.write(command + '\n')
+            output += await self._read_until_prompt(
+                self._config_prompt_pattern)
+        return output
+
+    async def disconnect(self):
+        if self._conn:
+            self._conn.close()
+            await self._conn.wait_closed()
+            self._conn = None
+
+
+class AsyncTransitionDevice():
+    """Variante asyncio de TransitionDevice.
+
+    Reutiliza la lista de comandos (_get_commands) y el parser
+    (_serializer) de la clase base; solo cambia el transporte.
+    """
+
+    async def _connect(self):
+        net_connect = AsyncSSHConnection(
+            host=self.mgmt_ip,
+            username=self.credentials['username'],
+            password=self.credentials['password']
+        )
+        with self._timed("connect"):
+            await net_connect.connect()
+        return net_connect
+
+    async def retrieve_information(self):
+        net_connect = None
+        try:
+            with self._timed("retrieve", ok=False) as retrieve_metric:
+                logger.info("Conectando al equipo: " + self.mgmt_ip)
+                net_connect = await self._connect()
+
+                sw_txt_information = {}
+
+                # Execute Show commands
+                for command in self._get_profile_commands():
+                    logger.info(
+                        command['msg'] + ": " +
+                        command['command']
+                    )
+
+                    with self._timed(
+                            "command",
+                            command=command['command']) as command_metric:
+                        for count_retry in range(4):
+                            show_content = await net_connect.send_command(
+                                command['command'])
+                            if not self._is_short_output(show_content):
+                                sw_txt_information[command['information']] = \
+                                    show_content
+                                break
+                            logger.info(
+                                "Some error occurred: The show " +
+                                "output is too short. Retrying..."
+                            )
+
+                        command_metric['retries'] = count_retry
+                        command_metric['bytes'] = len(show_content)
+
+                if self.record_dir:
+                    record_outputs(
+                        self.record_dir, self.mgmt_ip, sw_txt_information)
+
+                # Process the output of each show command
+                node_information = self._build_node_information(
+                    sw_txt_information)
+                retrieve_metric['ok'] = True
+            return node_information
+        except BaseException as e:
+            logger.info(e)
+            logger.info("No se pudo obtener/guardar"
+                        " la informacion del equipo {}".format(
+                            self.mgmt_ip))
+        finally:
+            if net_connect:
+                await net_connect.disconnect()
+
+    async def deploy_configuration(self, configuration: list = []):
+        if configuration:
+            logger.info("Iniciando el envio de configuracion.")
+            net_connect = None
+            try:
+                logger.info(f"Conectando al equipo: {self.mgmt_ip}")
+                with self._timed(
+                        "deploy", lines=len(configuration),
+                        ok=False) as deploy_metric:
+                    net_connect = await self._connect()
+                    output = await net_connect.send_config_set(configuration)
+                    deploy_metric['bytes'] = len(output or "")
+                    deploy_metric['ok'] = bool(output)
+
+                if output:
+                    logger.info(output)
+                    return output
+
+            except BaseException as e:
+                logger.error(e)
+                logger.error(
+                    f"No se logro aplicar la configuracion al equipo {self.mgmt_ip}")
+            finally:
+                if net_connect:
+                    await net_connect.disconnect()
+        else:
+            logger.info("La configuracion esta vacia.")
+
+
+class AsyncS4224(AsyncTransitionDevice, S4224):
+    pass
+
+
+class AsyncLIB4424(AsyncTransitionDevice, LIB4424):
+    pass
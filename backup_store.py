@@ -0,0 +1,176 @@
+import os
+import sys
+import gzip
+import json
+import hashlib
+import argparse
+import datetime
+import tempfile
+from bisect import bisect_right
+from serialization import json_default
+
+
+class BackupStore():
+    """Almacen de backups direccionado por contenido.
+
+    La configuracion (cnfg_txt) y el snapshot serializado de cada equipo se
+    guardan como blobs comprimidos con gzip, nombrados por su sha256, en
+    objects/<hash[:2]>/<hash>.gz: un contenido que ya existe no se vuelve a
+    escribir. Por cada equipo, manifests/<mgmt_ip>.json guarda las
+    versiones (timestamp -> hashes); una version nueva solo se agrega cuando
+    cambia alguno de los hashes, si no se actualiza su "last_seen".
+
+    El snapshot se guarda sin el cnfg_txt (ya esta en su propio blob) ni
+    los campos que cambian en cada toma aunque el equipo no cambie (el
+    uptime); esos valores quedan en la version del manifest.
+    """
+
+    # (seccion, campo) del snapshot que no forman parte del hash.
+    VOLATILE_FIELDS = [("system_status", "system_uptime")]
+
+    def __init__(self, root_dir="backup_store"):
+        self.root_dir = root_dir
+        os.makedirs(os.path.join(root_dir, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(root_dir, "manifests"), exist_ok=True)
+
+    @staticmethod
+    def _atomic_write(file_path, data):
+        # Archivo temporal en el mismo directorio y rename: un lector (u
+        # otro worker escribiendo el mismo blob) nunca ve un archivo a medias.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path))
+        try:
+            with os.fdopen(fd, "wb") as outfile:
+                outfile.write(data)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def _blob_path(self, blob_hash):
+        return os.path.join(
+            self.root_dir, "objects", blob_hash[:2], blob_hash + ".gz")
+
+    def _manifest_path(self, mgmt_ip):
+        return os.path.join(self.root_dir, "manifests", mgmt_ip + ".json")
+
+    def put_blob(self, content):
+        """Guarda el contenido si no existe. Devuelve (hash, bytes escritos)."""
+        data = content.encode("utf-8")
+        blob_hash = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(blob_hash)
+        if os.path.exists(blob_path):
+            return blob_hash, 0
+
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        compressed = gzip.compress(data, mtime=0)
+        self._atomic_write(blob_path, compressed)
+        return blob_hash, len(compressed)
+
+    def get_blob(self, blob_hash):
+        with open(self._blob_path(blob_hash), "rb") as infile:
+            return gzip.decompress(infile.read()).decode("utf-8")
+
+    def read_manifest(self, mgmt_ip):
+        try:
+            with open(self._manifest_path(mgmt_ip), "r") as infile:
+                return json.load(infile)
+        except FileNotFoundError:
+            return {"mgmt_ip": mgmt_ip, "versions": []}
+
+    def store(self, mgmt_ip, hostname, cnfg_txt, snapshot, timestamp=None):
+        """Guarda el backup de un equipo y devuelve la version vigente.
+
+        La version incluye "written_bytes": los bytes comprimidos que se
+        escribieron en esta llamada (0 si el equipo no cambio).
+        """
+        timestamp = (timestamp or datetime.datetime.now()).isoformat(
+            timespec="seconds")
+        snapshot = dict(snapshot, configuration=None)
+        volatile = {}
+        for section, field in self.VOLATILE_FIELDS:
+            if field in (snapshot.get(section) or {}):
+                snapshot[section] = dict(snapshot[section])
+                # Se deja la clave en None para conservar el orden original.
+                volatile[f"{section}.{field}"] = snapshot[section][field]
+                snapshot[section][field] = None
+
+        configuration_hash, configuration_bytes = self.put_blob(cnfg_txt)
+        snapshot_hash, snapshot_bytes = self.put_blob(
+            json.dumps(snapshot, default=json_default))
+
+        manifest = self.read_manifest(mgmt_ip)
+        versions = manifest['versions']
+        if (versions and
+                versions[-1]['configuration'] == configuration_hash and
+                versions[-1]['snapshot'] == snapshot_hash and
+                versions[-1]['hostname'] == hostname):
+            versions[-1]['last_seen'] = timestamp
+            versions[-1]['volatile'] = volatile
+        else:
+            versions.append(dict(
+                timestamp=timestamp,
+                last_seen=timestamp,
+                hostname=hostname,
+                configuration=configuration_hash,
+                snapshot=snapshot_hash,
+                volatile=volatile
+            ))
+        self._atomic_write(
+            self._manifest_path(mgmt_ip),
+            json.dumps(manifest, indent=4).encode("utf-8"))
+
+        return dict(
+            versions[-1],
+            written_bytes=configuration_bytes + snapshot_bytes)
+
+    def latest(self, mgmt_ip):
+        versions = self.read_manifest(mgmt_ip)['versions']
+        return versions[-1] if versions else None
+
+    def at(self, mgmt_ip, when):
+        """Version vigente del equipo en el momento when (datetime o ISO)."""
+        if isinstance(when, datetime.datetime):
+            when = when.isoformat(timespec="seconds")
+        versions = self.read_manifest(mgmt_ip)['versions']
+        index = bisect_right(
+            [version['timestamp'] for version in versions], when) - 1
+        return versions[index] if index >= 0 else None
+
+    def load_configuration(self, version):
+        return self.get_blob(version['configuration'])
+
+    def load_snapshot(self, version):
+        # Snapshot completo, con el cnfg_txt y los campos volatiles.
+        snapshot = json.loads(self.get_blob(version['snapshot']))
+        snapshot['configuration'] = {
+            "cnfg_txt": self.load_configuration(version)
+        }
+        for key, value in version.get('volatile', {}).items():
+            section, field = key.split(".")
+            snapshot[section][field] = value
+        return snapshot
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Consulta el almacen de backups")
+    parser.add_argument("root_dir", help="Directorio del almacen")
+    parser.add_argument("mgmt_ip")
+    parser.add_argument(
+        "--at", help="Fecha/hora ISO (ej: 2024-01-31T10:00:00); "
+                     "por defecto la ultima version")
+    parser.add_argument(
+        "--snapshot", action="store_true",
+        help="Muestra el snapshot JSON en lugar de la configuracion")
+    args = parser.parse_args()
+
+    store = BackupStore(args.root_dir)
+    version = (store.at(args.mgmt_ip, args.at) if args.at
+               else store.latest(args.mgmt_ip))
+    if version is None:
+        sys.exit(f"No hay backups del equipo {args.mgmt_ip}")
+
+    if args.snapshot:
+        print(json.dumps(store.load_snapshot(version), indent=4))
+    else:
+        print(store.load_configuration(version))
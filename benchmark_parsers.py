@@ -0,0 +1,202 @@
+import sys
+import json
+import timeit
+import argparse
+import tracemalloc
+from device_models import DEVICE_MODEL
+from transition_device import S4224
+from transition_device import LIB4424
+from synthetic_outputs import DEFAULT_SCALE
+from synthetic_outputs import synthetic_outputs
+from synthetic_outputs import interface_status_output
+
+
+DEVICE_CLASSES = {"S4224": (S4224, "1"), "LIB4424": (LIB4424, "6")}
+
+
+def create_benchmark_device(model):
+    device_class, device_model_id = DEVICE_CLASSES[model]
+    return device_class(
+        device_model_id=device_model_id,
+        mgmt_ip="0.0.0.0",
+        device_model=DEVICE_MODEL[device_model_id],
+        credentials={}
+    )
+
+
+def measure(function, number):
+    # Tiempo promedio por llamada (luego de una llamada de calentamiento)
+    # y pico de memoria de una llamada extra: tracemalloc se activa fuera
+    # de la medicion de tiempo.
+    function()
+    elapsed = timeit.timeit(function, number=number) / number
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def benchmark_cases(device, outputs):
+    # (nombre, funcion, texto de entrada) de cada metodo a medir.
+    config_index = device._index_configuration(outputs['cnfg_txt'].split('\n'))
+    configuration = device._get_configuration(outputs['cnfg_txt'])
+    ddmi_status = device._get_ddmi_status(
+        outputs['ddmi_status_txt'].split('\n'))
+
+    cases = [
+        (parser.__name__,
+         lambda information=information: device._parse_section(
+             information, outputs[information]),
+         outputs[information])
+        for information, parser in device._get_section_parsers().items()
+    ]
+    cases.extend([
+        ("_index_configuration",
+         lambda: device._index_configuration(outputs['cnfg_txt'].split('\n')),
+         outputs['cnfg_txt']),
+        ("_get_interfaces",
+         lambda: device._get_interfaces(config_index),
+         outputs['cnfg_txt']),
+        ("_get_vlans",
+         lambda: device._get_vlans(config_index),
+         outputs['cnfg_txt']),
+        ("_get_interface_status",
+         lambda: device._get_interface_status(
+             outputs['int_status_txt'].split('\n'), ddmi_status),
+         outputs['int_status_txt']),
+        ("_get_uplink_ports",
+         lambda: device._get_uplink_ports(
+             {"cnfg_json": configuration['cnfg_json']}),
+         outputs['cnfg_txt']),
+        ("_serializer",
+         lambda: device._serializer(outputs),
+         "\n".join(outputs.values())),
+    ])
+    return cases
+
+
+def benchmark_model(model, number=3, **scale):
+    scale = dict(DEFAULT_SCALE, **scale)
+    device = create_benchmark_device(model)
+    outputs = synthetic_outputs(model=model, **scale)
+
+    print(f"\n{model}: {scale['ports']}+{scale['ten_giga_ports']} puertos, "
+          f"{scale['vlans']} vlans, {scale['trunk_ranges']} rangos por trunk, "
+          f"{scale['macs']} MACs ({number} iteraciones)")
+    print(f"  {'metodo':<28}{'ms/llamada':>12}{'lineas/s':>14}"
+          f"{'MB/s':>10}{'pico MB':>10}")
+
+    results = {}
+    for name, function, input_txt in benchmark_cases(device, outputs):
+        elapsed, peak = measure(function, number)
+        lines = input_txt.count('\n') + 1
+        results[name] = dict(
+            seconds=elapsed,
+            lines_per_second=lines / elapsed,
+            mb_per_second=len(input_txt) / elapsed / 1e6,
+            peak_mb=peak / 1e6
+        )
+        print(f"  {name:<28}{elapsed * 1e3:>12.2f}"
+              f"{results[name]['lines_per_second']:>14.0f}"
+              f"{results[name]['mb_per_second']:>10.2f}"
+              f"{results[name]['peak_mb']:>10.2f}")
+
+    return results
+
+
+def compare_results(results, baseline, max_regression):
+    # Devuelve los metodos cuyo tiempo empeoro mas de max_regression
+    # respecto del baseline.
+    regressions = []
+    for model, model_results in results.items():
+        for name, result in model_results.items():
+            reference = baseline.get(model, {}).get(name)
+            if reference is None:
+                continue
+            change = result['seconds'] / reference['seconds'] - 1
+            if change > max_regression:
+                regressions.append((model, name, change))
+    return regressions
+
+
+def benchmark_interface_status(number=2000):
+    device = create_benchmark_device("S4224")
+    int_status_txt = interface_status_output().split('\n')
+
+    def regex_parser():
+        return [device._parse_interface_status_regex(line)
+                for line in int_status_txt]
+
+    column_time = timeit.timeit(
+        lambda: device._get_interface_status(int_status_txt, []),
+        number=number)
+    regex_time = timeit.timeit(regex_parser, number=number)
+
+    print(f"\nshow interface * status ({len(int_status_txt) - 2} puertos, "
+          f"{number} iteraciones)")
+    print(f"  columnas fijas : {column_time / number * 1e6:8.1f} us/salida")
+    print(f"  regex          : {regex_time / number * 1e6:8.1f} us/salida")
+    print(f"  speedup        : {regex_time / column_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark de los parsers con salidas sinteticas")
+    parser.add_argument(
+        "--model", choices=["S4224", "LIB4424", "all"], default="all")
+    parser.add_argument("--ports", type=int, default=DEFAULT_SCALE['ports'])
+    parser.add_argument(
+        "--ten-giga-ports", type=int, default=DEFAULT_SCALE['ten_giga_ports'])
+    parser.add_argument("--vlans", type=int, default=DEFAULT_SCALE['vlans'])
+    parser.add_argument(
+        "--trunk-ranges", type=int, default=DEFAULT_SCALE['trunk_ranges'],
+        help="Cantidad de rangos en cada trunk/hybrid allowed vlan")
+    parser.add_argument("--macs", type=int, default=DEFAULT_SCALE['macs'])
+    parser.add_argument(
+        "--number", type=int, default=3,
+        help="Iteraciones por metodo (default: 3)")
+    parser.add_argument(
+        "--save", help="Guarda los resultados en un archivo JSON")
+    parser.add_argument(
+        "--baseline",
+        help="Compara contra resultados guardados con --save y termina con "
+             "error si algun metodo empeora mas de --max-regression")
+    parser.add_argument(
+        "--max-regression", type=float, default=0.2,
+        help="Empeoramiento maximo tolerado respecto del baseline (default: 0.2)")
+    args = parser.parse_args()
+
+    scale = dict(
+        ports=args.ports,
+        ten_giga_ports=args.ten_giga_ports,
+        vlans=args.vlans,
+        trunk_ranges=args.trunk_ranges,
+        macs=args.macs
+    )
+    models = ["S4224", "LIB4424"] if args.model == "all" else [args.model]
+    results = {
+        model: benchmark_model(model, number=args.number, **scale)
+        for model in models
+    }
+    benchmark_interface_status()
+
+    if args.save:
+        with open(args.save, "w") as outfile:
+            json.dump(dict(scale=scale, results=results), outfile, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, "r") as infile:
+            baseline = json.load(infile)
+        # Solo son comparables los resultados tomados con la misma escala.
+        if baseline['scale'] != scale:
+            sys.exit(f"El baseline fue tomado con otra escala: "
+                     f"{baseline['scale']}")
+        regressions = compare_results(
+            results, baseline['results'], args.max_regression)
+        for model, name, change in regressions:
+            print(f"REGRESION {model} {name}: {change:+.0%}")
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,108 @@
+import re
+from device_models import DEVICE_MODEL
+
+# Configuracion de un puerto libre por modelo (DEVICE_MODEL[...]['model']),
+# sin la linea "interface ..." ni el "exit" del bloque.
+FREE_PORT_TEMPLATES = {
+    "S4224": (
+        "shutdown",
+        "no switchport mode access",
+        "no switchport mode hybrid",
+        "no switchport trunk native vlan",
+        "no switchport trunk allowed vlan",
+        "no switchport hybrid allowed vlan",
+        "no switchport hybrid native vlan",
+        "description LIBRE",
+        "switchport mode trunk",
+        "switchport trunk native vlan 4000",
+        "switchport trunk allowed vlan 4000",
+        "no spanning-tree",
+        "loop-protect",
+        "loop-protect action shutdown log trap",
+        "qos storm broadcast 10 mbps",
+        "qos storm unknown 10 mbps",
+    ),
+    "LIB4424": (
+        "shutdown",
+        "no switchport mode access",
+        "no switchport mode hybrid",
+        "no switchport trunk native vlan",
+        "no switchport trunk allowed vlan",
+        "no switchport hybrid allowed vlan",
+        "no switchport hybrid native vlan",
+        "description LIBRE",
+        "switchport mode trunk",
+        "switchport trunk native vlan 4000",
+        "switchport trunk allowed vlan 4000",
+        "no spanning-tree",
+        "loop-protect",
+        "loop-protect action shutdown log",
+        "qos storm broadcast 10 mbps",
+        "qos storm unknown 10 mbps",
+    ),
+}
+
+INTERFACE_NAME = re.compile(r'^(\S+) (\d+)/(\d+)$')
+
+
+def free_port_template(device_model_id):
+    return FREE_PORT_TEMPLATES[DEVICE_MODEL[device_model_id]['model']]
+
+
+def interface_ranges(interface_names):
+    """Agrupa las interfaces en rangos con la sintaxis de Transition.
+
+    ["GigabitEthernet 1/3", "GigabitEthernet 1/5", "GigabitEthernet 1/6",
+    "GigabitEthernet 1/7"] -> ["GigabitEthernet 1/3,5-7"]. Se arma un rango
+    por tipo de interfaz y slot, en el orden en que aparecen.
+    """
+    ports = {}
+    ranges = []
+    for interface_name in interface_names:
+        interface = INTERFACE_NAME.match(interface_name)
+        if interface is None:
+            # Nombre que no se puede agrupar: va en su propio bloque.
+            ranges.append(interface_name)
+            continue
+        interface_type, slot, port = interface.groups()
+        key = f"{interface_type} {slot}/"
+        if key not in ports:
+            ports[key] = set()
+            ranges.append(key)
+        ports[key].add(int(port))
+
+    for index, key in enumerate(ranges):
+        if key not in ports:
+            continue
+        port_ranges = []
+        for port in sorted(ports[key]):
+            if port_ranges and port == port_ranges[-1][1] + 1:
+                port_ranges[-1][1] = port
+            else:
+                port_ranges.append([port, port])
+        ranges[index] = key + ",".join([
+            str(start) if start == end else f"{start}-{end}"
+            for start, end in port_ranges
+        ])
+    return ranges
+
+
+def render_interface_config(interface_templates):
+    """Configuracion de interfaces con un bloque por template y rango.
+
+    interface_templates: lista de (interface_full_name, lineas del template).
+    Las interfaces con el mismo template se configuran juntas con
+    "interface GigabitEthernet 1/3,5-7", por lo que la cantidad de lineas
+    crece con los templates distintos y no con la cantidad de puertos.
+    """
+    templates = {}
+    for interface_name, template in interface_templates:
+        templates.setdefault(tuple(template), []).append(interface_name)
+
+    config = []
+    for template, interface_names in templates.items():
+        for interface_range in interface_ranges(interface_names):
+            config.append(f"interface {interface_range}")
+            config.extend(template)
+            config.append("exit")
+    return config
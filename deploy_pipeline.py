@@ -0,0 +1,186 @@
+import time
+import queue
+import threading
+from logger import logger
+
+
+class DevicePipeline():
+    """Toma de informacion, planificacion y deploy solapados por equipo.
+
+    Cada equipo pasa de la toma de informacion a la planificacion y a la
+    cola de deploy apenas estan sus datos, sin esperar al resto. Las etapas
+    se comunican por colas acotadas (queue_size): si el deploy se atrasa,
+    la toma de informacion se frena en lugar de acumular equipos en memoria.
+
+    collect_workers equipos se consultan en paralelo, la planificacion se
+    hace en un unico hilo y deploy_workers equipos se configuran en
+    paralelo. Como en WaveScheduler, los primeros canary_size deploys se
+    aplican solos y se esperan soak_time segundos antes de seguir; si el
+    porcentaje de fallas supera max_failure_rate el deploy se detiene.
+    """
+
+    # Marca de fin de la etapa anterior.
+    _DONE = object()
+
+    def __init__(self, collect_workers=8, deploy_workers=5, queue_size=16,
+                 canary_size=1, soak_time=15, max_failure_rate=0.25):
+        self.collect_workers = collect_workers
+        self.deploy_workers = deploy_workers
+        self.queue_size = queue_size
+        self.canary_size = canary_size
+        self.soak_time = soak_time
+        self.max_failure_rate = max_failure_rate
+
+    def run(self, items, collect, plan, deploy):
+        """Procesa cada item por las tres etapas.
+
+        collect(item) devuelve los datos del equipo, plan(item, datos)
+        devuelve lo que se entrega a deploy (o None si no hay nada que
+        aplicar) y deploy debe devolver una tupla (exito, resultado).
+        Devuelve la lista de resultados de deploy y la lista de items de
+        deploy que no se llegaron a aplicar porque el rollout se detuvo.
+        """
+        input_queue = queue.Queue()
+        for item in items:
+            input_queue.put(item)
+        plan_queue = queue.Queue(maxsize=self.queue_size)
+        deploy_queue = queue.Queue(maxsize=self.queue_size)
+
+        self._results = []
+        self._not_deployed = []
+        self._started = 0
+        self._finished = 0
+        self._failures = 0
+        self._stopped = False
+        self._lock = threading.Lock()
+        self._canary_done = threading.Event()
+        if self.canary_size <= 0:
+            self._canary_done.set()
+
+        collect_threads = [
+            threading.Thread(
+                target=self._collect_worker,
+                args=(input_queue, plan_queue, collect))
+            for _ in range(self.collect_workers)
+        ]
+        plan_thread = threading.Thread(
+            target=self._plan_worker,
+            args=(plan_queue, deploy_queue, plan))
+        deploy_threads = [
+            threading.Thread(
+                target=self._deploy_worker, args=(deploy_queue, deploy))
+            for _ in range(self.deploy_workers)
+        ]
+
+        for thread in collect_threads + [plan_thread] + deploy_threads:
+            thread.start()
+        for thread in collect_threads:
+            thread.join()
+        plan_queue.put(self._DONE)
+        plan_thread.join()
+        for thread in deploy_threads:
+            thread.join()
+
+        logger.info(
+            f"- Deploy finalizado: {self._failures} falla(s) de "
+            f"{self._finished} equipo(s).")
+        return self._results, self._not_deployed
+
+    def _collect_worker(self, input_queue, plan_queue, collect):
+        while True:
+            try:
+                item = input_queue.get_nowait()
+            except queue.Empty:
+                return
+            # Se bloquea si la cola esta llena: la planificacion y el
+            # deploy marcan el ritmo de la toma de informacion.
+            plan_queue.put((item, collect(item)))
+
+    def _plan_worker(self, plan_queue, deploy_queue, plan):
+        try:
+            while True:
+                entry = plan_queue.get()
+                if entry is self._DONE:
+                    return
+                item, data = entry
+                try:
+                    deploy_item = plan(item, data)
+                except Exception as e:
+                    logger.error(f"Error al planificar la configuracion: {e}")
+                    continue
+                if deploy_item is not None:
+                    deploy_queue.put(deploy_item)
+        finally:
+            for _ in range(self.deploy_workers):
+                deploy_queue.put(self._DONE)
+
+    def _deploy_worker(self, deploy_queue, deploy):
+        while True:
+            deploy_item = deploy_queue.get()
+            if deploy_item is self._DONE:
+                return
+
+            with self._lock:
+                canary = self._started < self.canary_size
+                self._started += 1
+            if not canary:
+                # El resto espera a que termine el canary.
+                self._canary_done.wait()
+
+            with self._lock:
+                if self._stopped:
+                    self._not_deployed.append(deploy_item)
+                    continue
+
+            canary_finished = False
+            completed = False
+            try:
+                try:
+                    ok, result = deploy(deploy_item)
+                except Exception as e:
+                    logger.error(f"Error al aplicar la configuracion: {e}")
+                    ok, result = False, []
+                    if canary:
+                        # Una excepcion en el canary no es una falla
+                        # esperable del equipo: no se sigue con el resto.
+                        with self._lock:
+                            self._stopped = True
+                        logger.error(
+                            "- El deploy del canary fallo con una excepcion. "
+                            "Se detiene el rollout.")
+
+                with self._lock:
+                    self._results.append(result)
+                    self._finished += 1
+                    if not ok:
+                        self._failures += 1
+                    failure_rate = self._failures / self._finished
+                    if (self._finished >= self.canary_size and
+                            failure_rate > self.max_failure_rate and
+                            not self._stopped):
+                        self._stopped = True
+                        logger.error(
+                            f"- El porcentaje de fallas del deploy ({failure_rate:.0%}) "
+                            f"supera el maximo permitido ({self.max_failure_rate:.0%}). "
+                            f"Se detiene el rollout.")
+                    canary_finished = (
+                        not self._canary_done.is_set() and
+                        self._finished >= self.canary_size)
+
+                if canary_finished:
+                    logger.info(
+                        f"- Canary finalizado: {self._failures} falla(s) de "
+                        f"{self._finished} equipo(s).")
+                    if not self._stopped and self.soak_time:
+                        logger.info(
+                            f"Esperando {self.soak_time} seg antes de continuar con el deploy.")
+                        time.sleep(self.soak_time)
+                completed = True
+            finally:
+                # Si el canary termina (bien o mal) el resto no puede quedar
+                # esperando: con el rollout detenido no se aplica nada mas.
+                if canary and not completed:
+                    with self._lock:
+                        self._stopped = True
+                if canary_finished or (canary and self._stopped):
+                    self._canary_done.set()
@@ -0,0 +1,70 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logger import logger
+
+
+class WaveScheduler():
+    """Aplica la configuracion por olas en lugar de equipo por equipo.
+
+    La primera ola (canary) tiene canary_size equipos y las siguientes
+    wave_size equipos, aplicados con hasta parallelism equipos en paralelo.
+    Entre olas se espera soak_time segundos y, si el porcentaje de fallas de
+    una ola supera max_failure_rate, el rollout se detiene.
+    """
+
+    def __init__(self, canary_size=1, wave_size=10, parallelism=5,
+                 soak_time=15, max_failure_rate=0.25):
+        self.canary_size = canary_size
+        self.wave_size = wave_size
+        self.parallelism = parallelism
+        self.soak_time = soak_time
+        self.max_failure_rate = max_failure_rate
+
+    def _waves(self, items):
+        waves = []
+        if self.canary_size > 0:
+            waves.append(items[:self.canary_size])
+            items = items[self.canary_size:]
+        for i in range(0, len(items), self.wave_size):
+            waves.append(items[i:i + self.wave_size])
+        return [wave for wave in waves if wave]
+
+    def run(self, items, deploy):
+        """Ejecuta deploy(item) sobre cada item, ola por ola.
+
+        deploy debe devolver una tupla (exito, resultado). Devuelve la lista
+        de resultados en el orden de items y la lista de items que no se
+        llegaron a aplicar porque el rollout se detuvo.
+        """
+        results = []
+        waves = self._waves(list(items))
+
+        for wave_number, wave in enumerate(waves, start=1):
+            logger.info(
+                f"- Ola {wave_number}/{len(waves)}: aplicando configuracion "
+                f"en {len(wave)} equipo(s).")
+            with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+                wave_results = list(executor.map(deploy, wave))
+
+            failures = len([ok for ok, result in wave_results if not ok])
+            results.extend([result for ok, result in wave_results])
+
+            failure_rate = failures / len(wave)
+            logger.info(
+                f"- Ola {wave_number}/{len(waves)} finalizada: "
+                f"{failures} falla(s) de {len(wave)} equipo(s).")
+
+            pending = [item for wave in waves[wave_number:] for item in wave]
+            if failure_rate > self.max_failure_rate:
+                logger.error(
+                    f"- El porcentaje de fallas de la ola ({failure_rate:.0%}) "
+                    f"supera el maximo permitido ({self.max_failure_rate:.0%}). "
+                    f"Se detiene el rollout: {len(pending)} equipo(s) sin aplicar.")
+                return results, pending
+
+            if pending and self.soak_time:
+                logger.info(
+                    f"Esperando {self.soak_time} seg antes de la siguiente ola.")
+                time.sleep(self.soak_time)
+
+        return results, []
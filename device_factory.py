@@ -2,11 +2,18 @@ from transition_device import S4224
 from transition_device import LIB4424
 
 
-def create_device(**kwargs):
+def create_device(transport="netmiko", **kwargs):
 
-    if kwargs['device_model']['device_model_id'] == 1:
-        return S4224(**kwargs)
-    elif kwargs['device_model']['device_model_id'] == 6:
-        return LIB4424(**kwargs)
+    device_classes = {1: S4224, 6: LIB4424}
+    if transport == "asyncssh":
+        # Import diferido: asyncssh solo es requerido por el backend async.
+        from async_transition_device import AsyncS4224
+        from async_transition_device import AsyncLIB4424
+        device_classes = {1: AsyncS4224, 6: AsyncLIB4424}
+
+    device_class = device_classes.get(
+        kwargs['device_model']['device_model_id'])
+    if device_class:
+        return device_class(**kwargs)
     else:
         print("Error: The Device is Not Suported.")
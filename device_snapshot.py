@@ -0,0 +1,121 @@
+from collections.abc import MutableMapping
+
+
+class DeviceSnapshot(MutableMapping):
+    """Informacion de un equipo que se parsea a medida que se consulta.
+
+    Guarda las salidas crudas de los comandos show y arma cada clave del
+    JSON de backup (serialized_configuration, mac_table_status,
+    interface_status, ...) recien cuando se accede a ella. Cada salida se
+    parsea una unica vez: consultar el link_state de un puerto no parsea
+    la tabla de MAC ni la configuracion.
+
+    Las claves y su orden son los del JSON de backup para el perfil de
+    recoleccion del equipo; to_dict()/to_json() devuelven ese diccionario.
+    """
+
+    # Clave del JSON -> salida de _get_commands que necesita, en el orden
+    # en que se guardan en el backup.
+    LAYOUT = [
+        ("configuration", "cnfg_txt"),
+        ("serialized_configuration", "cnfg_txt"),
+        ("mac_table_status", "mac_add_txt"),
+        ("interface_status", "int_status_txt"),
+        ("uplink_ports", "cnfg_txt"),
+        ("system_status", "system_status_txt"),
+        ("loop_protect_status", "lp_status_txt"),
+        ("os_version", "system_status_txt"),
+        ("hostname", "system_status_txt"),
+        ("serialnumber", "system_status_txt"),
+    ]
+
+    def __init__(self, device, sw_txt_information, parsed_sections=None,
+                 profile_sections=None):
+        self._device = device
+        self._raw_sections = sw_txt_information
+        # Salidas ya parseadas (por ejemplo en modo streaming).
+        self._parsed_sections = dict(parsed_sections or {})
+        self._profile_sections = profile_sections or list(
+            sw_txt_information) + list(self._parsed_sections)
+        # Como con el armado completo, falta una salida del perfil: KeyError.
+        for information in self._profile_sections:
+            if (information not in self._raw_sections and
+                    information not in self._parsed_sections):
+                raise KeyError(information)
+        self._keys = [
+            key for key, information in self.LAYOUT
+            if information in self._profile_sections
+        ]
+        self._values = {}
+
+    def _section(self, information):
+        # Parseo memoizado de una salida. Si no fue tomada: KeyError.
+        if information not in self._parsed_sections:
+            self._parsed_sections[information] = \
+                self._device._serialize_section(
+                    information, self._raw_sections[information])
+        return self._parsed_sections[information]
+
+    def _build(self, key):
+        if key == "configuration":
+            if "cnfg_txt" in self._raw_sections:
+                return {"cnfg_txt": self._raw_sections['cnfg_txt']}
+            return {"cnfg_txt": self._section('cnfg_txt')['cnfg_txt']}
+        if key == "serialized_configuration":
+            return {"cnfg_json": self._section('cnfg_txt')['cnfg_json']}
+        if key == "mac_table_status":
+            return {'mac_table': self._section('mac_add_txt')}
+        if key == "interface_status":
+            ddmi_status = []
+            if "ddmi_status_txt" in self._profile_sections:
+                ddmi_status = self._section('ddmi_status_txt')
+            return {
+                'interfaces': self._device._attach_ddmi_status(
+                    self._section('int_status_txt'), ddmi_status)
+            }
+        if key == "uplink_ports":
+            return self._device._get_uplink_ports(
+                self['serialized_configuration'])
+        if key == "system_status":
+            return self._section('system_status_txt')
+        if key == "loop_protect_status":
+            return self._section('lp_status_txt')
+        if key == "os_version":
+            return self['system_status']['os_version']
+        if key == "hostname":
+            return self['system_status']['system_name']
+        if key == "serialnumber":
+            return self['system_status']['serialnumber']
+        raise KeyError(key)
+
+    def __getitem__(self, key):
+        if key not in self._values:
+            if key not in self._keys:
+                raise KeyError(key)
+            self._values[key] = self._build(key)
+        return self._values[key]
+
+    def __setitem__(self, key, value):
+        # Campos agregados luego de la toma (mgmt_ip, sco_id, ...).
+        if key not in self._keys:
+            self._keys.append(key)
+        self._values[key] = value
+
+    def __delitem__(self, key):
+        self._keys.remove(key)
+        self._values.pop(key, None)
+
+    def __iter__(self):
+        return iter(list(self._keys))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def is_parsed(self, information):
+        return information in self._parsed_sections
+
+    def to_dict(self):
+        return {key: self[key] for key in self._keys}
+
+    def to_json(self):
+        return self.to_dict()
@@ -0,0 +1,346 @@
+import sys
+import glob
+import json
+import sqlite3
+import argparse
+import datetime
+import threading
+from vlan_set import VlanSet
+
+# Rango de VLAN de un trunk/hybrid sin "allowed vlan".
+ALL_VLANS = (1, 4094)
+
+
+class FleetStore():
+    """Estado de la flota en una base SQLite con indices.
+
+    Cada snapshot (el JSON de _serializer) se descompone en tablas:
+    devices (system_status), interfaces (estado de los puertos unido con
+    su configuracion y la marca de uplink), interface_vlans (las VLAN de
+    cada puerto como intervalos), vlans, macs y ddmi. Los snapshots se
+    acumulan en memoria y se escriben de a batch_size equipos en una unica
+    transaccion; cada equipo reemplaza por completo los datos anteriores.
+
+    Las consultas habituales (puertos Down con una descripcion, equipos
+    con una version de OS, puertos con una VLAN, donde esta una MAC) usan
+    indices y no requieren leer los backups.
+    """
+
+    SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS devices ("
+        " mgmt_ip TEXT PRIMARY KEY,"
+        " hostname TEXT,"
+        " device_model_id TEXT,"
+        " os_version TEXT,"
+        " serialnumber TEXT,"
+        " system_location TEXT,"
+        " mac_address TEXT,"
+        " system_uptime TEXT,"
+        " updated_at TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS interfaces ("
+        " mgmt_ip TEXT NOT NULL,"
+        " interface_full_name TEXT NOT NULL,"
+        " interface_type TEXT,"
+        " link_state TEXT,"
+        " link_medium TEXT,"
+        " speed_duplex TEXT,"
+        " admin_mode TEXT,"
+        " description TEXT,"
+        " port_mode TEXT,"
+        " native_vlan INTEGER,"
+        " vlan_members TEXT,"
+        " config_admin_state TEXT,"
+        " uplink INTEGER NOT NULL DEFAULT 0,"
+        " PRIMARY KEY (mgmt_ip, interface_full_name))",
+        "CREATE TABLE IF NOT EXISTS interface_vlans ("
+        " mgmt_ip TEXT NOT NULL,"
+        " interface_full_name TEXT NOT NULL,"
+        " vlan_start INTEGER NOT NULL,"
+        " vlan_end INTEGER NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS vlans ("
+        " mgmt_ip TEXT NOT NULL,"
+        " vlan_start INTEGER NOT NULL,"
+        " vlan_end INTEGER NOT NULL,"
+        " vlan_name TEXT)",
+        "CREATE TABLE IF NOT EXISTS macs ("
+        " mgmt_ip TEXT NOT NULL,"
+        " mac TEXT NOT NULL,"
+        " vlan_id INTEGER,"
+        " interface TEXT,"
+        " mac_type TEXT)",
+        "CREATE TABLE IF NOT EXISTS ddmi ("
+        " mgmt_ip TEXT NOT NULL,"
+        " interface TEXT NOT NULL,"
+        " vendor TEXT,"
+        " part_number TEXT,"
+        " serial_number TEXT,"
+        " revision TEXT,"
+        " transceiver TEXT,"
+        " PRIMARY KEY (mgmt_ip, interface))",
+        "CREATE INDEX IF NOT EXISTS devices_os_version"
+        " ON devices (os_version)",
+        "CREATE INDEX IF NOT EXISTS devices_hostname ON devices (hostname)",
+        "CREATE INDEX IF NOT EXISTS interfaces_link_state"
+        " ON interfaces (link_state, description)",
+        "CREATE INDEX IF NOT EXISTS interfaces_description"
+        " ON interfaces (description)",
+        "CREATE INDEX IF NOT EXISTS interface_vlans_range"
+        " ON interface_vlans (vlan_start, vlan_end)",
+        "CREATE INDEX IF NOT EXISTS interface_vlans_device"
+        " ON interface_vlans (mgmt_ip)",
+        "CREATE INDEX IF NOT EXISTS vlans_range"
+        " ON vlans (vlan_start, vlan_end)",
+        "CREATE INDEX IF NOT EXISTS vlans_device ON vlans (mgmt_ip)",
+        "CREATE INDEX IF NOT EXISTS macs_mac ON macs (mac)",
+        "CREATE INDEX IF NOT EXISTS macs_device ON macs (mgmt_ip, interface)",
+        "CREATE INDEX IF NOT EXISTS ddmi_serial_number"
+        " ON ddmi (serial_number)",
+    ]
+
+    # Tablas con datos por equipo, en el orden en que se insertan.
+    DEVICE_TABLES = [
+        "devices", "interfaces", "interface_vlans", "vlans", "macs", "ddmi"]
+
+    def __init__(self, file_path="fleet_store.db", batch_size=500):
+        self.file_path = file_path
+        self.batch_size = batch_size
+        self._pending = []
+        self._lock = threading.Lock()
+        # Los workers de la toma de informacion agregan snapshots.
+        self._conn = sqlite3.connect(file_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            for statement in self.SCHEMA:
+                self._conn.execute(statement)
+
+    @staticmethod
+    def _vlan_set(vlans):
+        # VlanSet, "1-100,200" (JSON de backup), lista (--legacy-vlan-lists)
+        # o una unica VLAN. Un trunk/hybrid sin "allowed vlan" se guarda
+        # como ["All"]: todas las VLAN.
+        if isinstance(vlans, VlanSet):
+            return vlans
+        if isinstance(vlans, int):
+            return VlanSet.from_vlans([vlans])
+        if isinstance(vlans, str) and vlans != "All":
+            return VlanSet.from_string(vlans) if vlans else VlanSet()
+        if vlans == "All" or "All" in (vlans or []):
+            return VlanSet([ALL_VLANS])
+        return VlanSet.from_vlans(vlans or [])
+
+    @classmethod
+    def _rows(cls, snapshot, updated_at):
+        # Filas de cada tabla para un snapshot. Segun el perfil de
+        # recoleccion algunas secciones pueden faltar.
+        mgmt_ip = snapshot['mgmt_ip']
+        system_status = snapshot.get('system_status') or {}
+        rows = {table: [] for table in cls.DEVICE_TABLES}
+        rows['devices'].append((
+            mgmt_ip, snapshot.get('hostname'),
+            snapshot.get('device_model_id'), snapshot.get('os_version'),
+            snapshot.get('serialnumber'), system_status.get('system_location'),
+            system_status.get('mac_address'),
+            system_status.get('system_uptime'), updated_at))
+
+        interfaces = {}
+        ddmi_rows = {}
+        for if_status in (snapshot.get('interface_status') or {}).get(
+                'interfaces', []):
+            interfaces[if_status['interface_full_name']] = dict(
+                interface_type=if_status['interface_type'],
+                link_state=if_status['link_state'],
+                link_medium=if_status['link_medium'],
+                speed_duplex=if_status['speed_duplex'],
+                admin_mode=if_status['admin_mode'])
+            ddmi = if_status.get('ddmi_information')
+            if ddmi:
+                ddmi_rows[if_status['interface_full_name']] = (
+                    mgmt_ip, if_status['interface_full_name'],
+                    ddmi.get('vendor'), ddmi.get('part_number'),
+                    ddmi.get('serial_number'), ddmi.get('revision'),
+                    ddmi.get('transceiver'))
+        rows['ddmi'] = list(ddmi_rows.values())
+
+        cnfg_json = (snapshot.get('serialized_configuration') or {}).get(
+            'cnfg_json') or {}
+        for interface_type, cnfg_interfaces in cnfg_json.get(
+                'cnfg_interfaces', {}).items():
+            for cnfg_interface in cnfg_interfaces:
+                interface = interfaces.setdefault(
+                    cnfg_interface['full_name'],
+                    dict(interface_type=interface_type))
+                switchport = cnfg_interface.get('switchport') or {}
+                vlans = switchport.get('vlans') or {}
+                vlan_set = cls._vlan_set(vlans.get('members'))
+                # Sin "native vlan" en la configuracion queda el default [1].
+                native_vlan = vlans.get('native')
+                if isinstance(native_vlan, list):
+                    native_vlan = native_vlan[0] if native_vlan else None
+                interface.update(
+                    description=" ".join(cnfg_interface.get('description') or [])
+                    or None,
+                    port_mode=switchport.get('port-mode'),
+                    native_vlan=native_vlan,
+                    vlan_members=vlan_set.to_range_string(),
+                    config_admin_state=cnfg_interface.get('admin_state'))
+                rows['interface_vlans'].extend([
+                    (mgmt_ip, cnfg_interface['full_name'], start, end)
+                    for start, end in vlan_set.intervals()
+                ])
+        # Las entradas de la tabla de VLAN pueden ser rangos (VlanSet).
+        rows['vlans'] = [
+            (mgmt_ip, start, end, vlan.get('vlan_name'))
+            for vlan in cnfg_json.get('cnfg_vlans', [])
+            for start, end in cls._vlan_set(vlan['vlan_id']).intervals()
+        ]
+
+        uplink_ports = set(snapshot.get('uplink_ports') or [])
+        rows['interfaces'] = [
+            (mgmt_ip, interface_full_name, interface.get('interface_type'),
+             interface.get('link_state'), interface.get('link_medium'),
+             interface.get('speed_duplex'), interface.get('admin_mode'),
+             interface.get('description'), interface.get('port_mode'),
+             interface.get('native_vlan'), interface.get('vlan_members'),
+             interface.get('config_admin_state'),
+             int(interface_full_name in uplink_ports))
+            for interface_full_name, interface in interfaces.items()
+        ]
+
+        rows['macs'] = [
+            (mgmt_ip, mac['mac'], int(mac['vlan_id']), mac['interface'],
+             mac['mac_type'])
+            for mac in (snapshot.get('mac_table_status') or {}).get(
+                'mac_table', [])
+        ]
+        return rows
+
+    def add(self, snapshot, updated_at=None):
+        """Agrega el snapshot de un equipo; se escribe al completar un batch."""
+        updated_at = (updated_at or datetime.datetime.now()).isoformat(
+            timespec="seconds")
+        rows = self._rows(snapshot, updated_at)
+        with self._lock:
+            self._pending.append((snapshot['mgmt_ip'], rows))
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        with self._conn:
+            mgmt_ips = [(mgmt_ip,) for mgmt_ip, rows in self._pending]
+            for table in self.DEVICE_TABLES:
+                self._conn.executemany(
+                    f"DELETE FROM {table} WHERE mgmt_ip = ?", mgmt_ips)
+            for mgmt_ip, rows in self._pending:
+                for table in self.DEVICE_TABLES:
+                    if rows[table]:
+                        placeholders = ", ".join(["?"] * len(rows[table][0]))
+                        self._conn.executemany(
+                            f"INSERT OR REPLACE INTO {table}"
+                            f" VALUES ({placeholders})", rows[table])
+        self._pending = []
+
+    def ingest_files(self, file_paths):
+        """Carga backups JSON ya escritos (backup_configuration/*.json)."""
+        count = 0
+        for file_path in file_paths:
+            with open(file_path, "r") as infile:
+                snapshot = json.load(infile)
+            if 'mgmt_ip' in snapshot:
+                self.add(snapshot)
+                count += 1
+        self.flush()
+        return count
+
+    def query(self, sql, parameters=()):
+        self.flush()
+        with self._lock:
+            cursor = self._conn.execute(sql, parameters)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def ports_by_state(self, link_state="Down", description=None):
+        sql = ("SELECT d.hostname, i.* FROM interfaces i"
+               " JOIN devices d USING (mgmt_ip) WHERE i.link_state = ?")
+        parameters = [link_state]
+        if description is not None:
+            sql += " AND i.description = ?"
+            parameters.append(description)
+        return self.query(sql, parameters)
+
+    def devices_by_os_version(self, os_version):
+        return self.query(
+            "SELECT * FROM devices WHERE os_version = ?", (os_version,))
+
+    def ports_with_vlan(self, vlan_id):
+        return self.query(
+            "SELECT DISTINCT d.hostname, v.mgmt_ip, v.interface_full_name"
+            " FROM interface_vlans v JOIN devices d USING (mgmt_ip)"
+            " WHERE v.vlan_start <= ? AND v.vlan_end >= ?",
+            (vlan_id, vlan_id))
+
+    def devices_with_vlan(self, vlan_id):
+        return self.query(
+            "SELECT DISTINCT d.hostname, v.mgmt_ip, v.vlan_name"
+            " FROM vlans v JOIN devices d USING (mgmt_ip)"
+            " WHERE v.vlan_start <= ? AND v.vlan_end >= ?",
+            (vlan_id, vlan_id))
+
+    def find_mac(self, mac):
+        return self.query(
+            "SELECT d.hostname, m.* FROM macs m JOIN devices d USING (mgmt_ip)"
+            " WHERE m.mac = ?", (mac.lower(),))
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Consulta el estado de la flota")
+    parser.add_argument("file_path", help="Base SQLite de la flota")
+    parser.add_argument(
+        "--ingest", nargs="+", metavar="JSON",
+        help="Carga backups JSON (por ejemplo backup_configuration/*.json)")
+    parser.add_argument(
+        "--ports", metavar="LINK_STATE",
+        help="Puertos en este estado (ej: Down)")
+    parser.add_argument(
+        "--description", help="Con --ports, solo los puertos con esta descripcion")
+    parser.add_argument("--os-version", help="Equipos con esta version de OS")
+    parser.add_argument("--vlan", type=int, help="Puertos con esta VLAN")
+    parser.add_argument("--mac", help="Donde se aprendio esta MAC")
+    parser.add_argument("--sql", help="Consulta SQL libre")
+    args = parser.parse_args()
+
+    store = FleetStore(args.file_path)
+    if args.ingest:
+        file_paths = [path for pattern in args.ingest
+                      for path in sorted(glob.glob(pattern))]
+        count = store.ingest_files(file_paths)
+        print(f"{count} equipo(s) cargados en {args.file_path}",
+              file=sys.stderr)
+
+    rows = None
+    if args.ports:
+        rows = store.ports_by_state(args.ports, args.description)
+    elif args.os_version:
+        rows = store.devices_by_os_version(args.os_version)
+    elif args.vlan is not None:
+        rows = store.ports_with_vlan(args.vlan)
+    elif args.mac:
+        rows = store.find_mac(args.mac)
+    elif args.sql:
+        rows = store.query(args.sql)
+
+    if rows is not None:
+        for row in rows:
+            print(json.dumps(row))
+    store.close()
@@ -0,0 +1,34 @@
+class InventoryIndex():
+    """Indices en memoria sobre el CSV de entrada y el estado de los equipos.
+
+    Reemplaza los recorridos anidados (filas del CSV x equipos x interfaces)
+    por busquedas en diccionarios, de forma que armar el plan de cambios sea
+    lineal en la cantidad de filas del CSV.
+    """
+
+    def __init__(self, csv_data):
+        # Puertos del CSV agrupados por mgmt_ip, en el orden del archivo.
+        self.ports_by_mgmt_ip = {}
+        for row in csv_data:
+            self.ports_by_mgmt_ip.setdefault(row['mgmt_ip'], []).append(row)
+
+    def ports(self, mgmt_ip):
+        return self.ports_by_mgmt_ip.get(mgmt_ip, [])
+
+    @staticmethod
+    def interfaces_by_name(interface_status):
+        # Interfaces del equipo indexadas por interface_full_name.
+        interfaces = {}
+        for if_status in interface_status:
+            interfaces.setdefault(
+                if_status['interface_full_name'], []).append(if_status)
+        return interfaces
+
+    def requested_interfaces(self, mgmt_ip, interface_status):
+        """Estado de los puertos del CSV para el equipo mgmt_ip."""
+        interfaces = self.interfaces_by_name(interface_status)
+        requested = []
+        for row in self.ports(mgmt_ip):
+            csv_if_name = f"GigabitEthernet 1/{row['port_number']}"
+            requested.extend(interfaces.get(csv_if_name, []))
+        return requested
@@ -1,16 +1,123 @@
+import json
+import queue
+import atexit
 import logging
+import contextvars
+import logging.handlers
+from contextlib import contextmanager
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-formatter = logging.Formatter("%(asctime)s [%(levelname)s]: %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+# Contexto del equipo que se esta procesando (mgmt_ip, hostname, phase).
+# Al ser un ContextVar cada hilo del pool y cada tarea asyncio tiene el suyo.
+log_context = contextvars.ContextVar("log_context", default={})
+
+LOG_CONTEXT_FIELDS = ("mgmt_ip", "hostname", "phase")
+
+
+class ContextFilter(logging.Filter):
+    """Agrega al registro los campos del contexto del equipo.
+
+    Se evalua en el hilo que genera el log; si el registro ya trae los
+    campos (por ejemplo al salir de la cola) no se pisan.
+    """
+
+    def filter(self, record):
+        if not hasattr(record, "log_context"):
+            record.log_context = log_context.get()
+            record.context = "".join([
+                f" [{record.log_context[field]}]"
+                for field in LOG_CONTEXT_FIELDS
+                if record.log_context.get(field)
+            ])
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Un objeto JSON por linea, con los campos del contexto del equipo."""
+
+    def format(self, record):
+        entry = {
+            "timestamp": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "message": record.getMessage()
+        }
+        entry.update(getattr(record, "log_context", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+@contextmanager
+def device_log_context(**fields):
+    """Define mgmt_ip/hostname/phase para los logs emitidos en el bloque."""
+    token = log_context.set(dict(log_context.get(), **fields))
+    try:
+        yield
+    finally:
+        log_context.reset(token)
+
+
+formatter = logging.Formatter("%(asctime)s [%(levelname)s]%(context)s: %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+context_filter = ContextFilter()
 
 console_handler = logging.StreamHandler()
 console_handler.setLevel(logging.INFO)
 console_handler.setFormatter(formatter)
+console_handler.addFilter(context_filter)
 logger.addHandler(console_handler)
 
 file_handler = logging.FileHandler("output_log.txt", mode="a")
 file_handler.setLevel(logging.DEBUG)
 file_handler.setFormatter(formatter)
+file_handler.addFilter(context_filter)
 logger.addHandler(file_handler)
+
+queue_listener = None
+
+
+def configure_logging(use_queue=False, json_lines=False):
+    """Ajusta los handlers del logger raiz.
+
+    use_queue: los workers solo encolan los registros (QueueHandler) y un
+    hilo en segundo plano (QueueListener) los escribe en consola y archivo,
+    de forma que el log nunca bloquea la comunicacion con los equipos.
+    json_lines: el archivo de log se escribe como JSON lines
+    (output_log.jsonl) en lugar de texto.
+    """
+    global file_handler, queue_listener
+
+    if json_lines:
+        logger.removeHandler(file_handler)
+        file_handler.close()
+        file_handler = logging.FileHandler("output_log.jsonl", mode="a")
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(
+            JsonLinesFormatter(datefmt="%Y-%m-%d %H:%M:%S"))
+        file_handler.addFilter(context_filter)
+        logger.addHandler(file_handler)
+
+    if use_queue and queue_listener is None:
+        logger.removeHandler(console_handler)
+        logger.removeHandler(file_handler)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        # El contexto se toma en el hilo del worker, antes de encolar.
+        queue_handler.addFilter(context_filter)
+        logger.addHandler(queue_handler)
+
+        queue_listener = logging.handlers.QueueListener(
+            log_queue, console_handler, file_handler,
+            respect_handler_level=True)
+        queue_listener.start()
+        atexit.register(stop_queue_logging)
+
+
+def stop_queue_logging():
+    # Escribe los registros pendientes y detiene el hilo de la cola.
+    global queue_listener
+    if queue_listener is not None:
+        queue_listener.stop()
+        queue_listener = None
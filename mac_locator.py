@@ -0,0 +1,165 @@
+import os
+import re
+import sys
+import glob
+import json
+import sqlite3
+import argparse
+import datetime
+import threading
+from mac_table import MacTable
+
+
+class MacLocator():
+    """Indice invertido MAC -> (equipo, vlan, interfaz, fecha) de la flota.
+
+    Se alimenta con la tabla de MAC de cada toma de informacion, sin las
+    entradas aprendidas en los uplink_ports del equipo: el resultado apunta
+    al puerto de acceso donde esta conectado el CPE. El indice es
+    incremental: una ubicacion que ya existe solo actualiza su last_seen,
+    de forma que se conserva donde estuvo una MAC en tomas anteriores.
+
+    Las MAC se guardan empaquetadas en un entero (MacTable.pack_mac) como
+    primera columna de la clave primaria, por lo que una busqueda es un
+    rango sobre el indice aun con millones de entradas.
+    """
+
+    def __init__(self, file_path="mac_index.db", batch_size=10000):
+        # batch_size: entradas de MAC (no equipos) por transaccion.
+        self.file_path = file_path
+        self.batch_size = batch_size
+        self._pending = []
+        self._lock = threading.Lock()
+        # Los workers de la toma de informacion agregan tablas de MAC.
+        self._conn = sqlite3.connect(file_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS mac_locations ("
+                " mac INTEGER NOT NULL,"
+                " mgmt_ip TEXT NOT NULL,"
+                " vlan_id INTEGER NOT NULL,"
+                " interface TEXT NOT NULL,"
+                " hostname TEXT,"
+                " mac_type TEXT,"
+                " first_seen TEXT NOT NULL,"
+                " last_seen TEXT NOT NULL,"
+                " PRIMARY KEY (mac, mgmt_ip, vlan_id, interface))"
+                " WITHOUT ROWID")
+
+    @staticmethod
+    def normalize_mac(mac):
+        # Acepta 00:11:22:33:44:55, 00-11-22-33-44-55 y 0011.2233.4455.
+        digits = re.sub(r"[^0-9a-fA-F]", "", mac)
+        if len(digits) != 12:
+            raise ValueError(f"MAC invalida: {mac}")
+        return MacTable.pack_mac(digits)
+
+    def add(self, snapshot, seen_at=None):
+        """Agrega la tabla de MAC de un snapshot; se escribe por lotes.
+
+        Devuelve la cantidad de entradas agregadas (sin las de uplink).
+        """
+        mac_table = (snapshot.get('mac_table_status') or {}).get('mac_table')
+        if not mac_table:
+            return 0
+        seen_at = (seen_at or datetime.datetime.now()).isoformat(
+            timespec="seconds")
+        uplink_ports = set(snapshot.get('uplink_ports') or [])
+        rows = [
+            (MacTable.pack_mac(mac['mac']), snapshot['mgmt_ip'],
+             int(mac['vlan_id']), mac['interface'], snapshot.get('hostname'),
+             mac['mac_type'], seen_at, seen_at)
+            for mac in mac_table
+            if mac['interface'] not in uplink_ports
+        ]
+        with self._lock:
+            self._pending.extend(rows)
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+        return len(rows)
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO mac_locations VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (mac, mgmt_ip, vlan_id, interface) DO UPDATE SET"
+                " hostname = excluded.hostname,"
+                " mac_type = excluded.mac_type,"
+                " last_seen = MAX(last_seen, excluded.last_seen)",
+                self._pending)
+        self._pending = []
+
+    def ingest_files(self, file_paths):
+        """Carga backups JSON ya escritos; la fecha es la del archivo."""
+        count = 0
+        for file_path in file_paths:
+            with open(file_path, "r") as infile:
+                snapshot = json.load(infile)
+            if 'mgmt_ip' in snapshot:
+                count += self.add(snapshot, datetime.datetime.fromtimestamp(
+                    os.path.getmtime(file_path)))
+        self.flush()
+        return count
+
+    def lookup(self, mac):
+        """Ubicaciones de la MAC, la mas reciente primero."""
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT mgmt_ip, hostname, vlan_id, interface, mac_type,"
+                " first_seen, last_seen FROM mac_locations WHERE mac = ?"
+                " ORDER BY last_seen DESC",
+                (self.normalize_mac(mac),)).fetchall()
+        return [
+            dict(mac=MacTable.unpack_mac(self.normalize_mac(mac)),
+                 mgmt_ip=mgmt_ip, hostname=hostname, vlan_id=vlan_id,
+                 interface=interface, mac_type=mac_type,
+                 first_seen=first_seen, last_seen=last_seen)
+            for (mgmt_ip, hostname, vlan_id, interface, mac_type,
+                 first_seen, last_seen) in rows
+        ]
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Busca en que equipo y puerto se aprendio una MAC")
+    parser.add_argument("file_path", help="Base SQLite del indice de MAC")
+    parser.add_argument("macs", nargs="*", help="MAC a buscar")
+    parser.add_argument(
+        "--ingest", nargs="+", metavar="JSON",
+        help="Carga backups JSON (por ejemplo backup_configuration/*.json)")
+    args = parser.parse_args()
+
+    locator = MacLocator(args.file_path)
+    if args.ingest:
+        file_paths = [path for pattern in args.ingest
+                      for path in sorted(glob.glob(pattern))]
+        count = locator.ingest_files(file_paths)
+        print(f"{count} entrada(s) cargadas en {args.file_path}",
+              file=sys.stderr)
+
+    not_found = False
+    for mac in args.macs:
+        try:
+            locations = locator.lookup(mac)
+        except ValueError as e:
+            sys.exit(str(e))
+        if not locations:
+            print(f"No se encontro la MAC {mac}", file=sys.stderr)
+            not_found = True
+        for location in locations:
+            print(json.dumps(location))
+    locator.close()
+    sys.exit(1 if not_found else 0)
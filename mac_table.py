@@ -0,0 +1,118 @@
+from array import array
+
+
+class MacTable():
+    """Tabla de MAC en formato columnar.
+
+    Cada entrada ocupa una fila en arrays paralelos: la MAC empaquetada en un
+    entero de 48 bits, la VLAN y el id del puerto como enteros chicos y el
+    tipo (Dynamic/Static) como id de un valor internado. Mientras se cargan
+    las filas se mantienen los indices puerto -> filas y vlan -> filas.
+
+    Iterar la tabla devuelve los mismos diccionarios que el formato anterior
+    (mac_type, vlan_id, mac, interface), que es lo que se guarda en el JSON.
+    """
+
+    def __init__(self):
+        self._macs = array('Q')
+        self._vlans = array('H')
+        self._ports = array('H')
+        self._types = array('B')
+        self._port_names = []
+        self._port_ids = {}
+        self._type_names = []
+        self._type_ids = {}
+        self._port_index = {}
+        self._vlan_index = {}
+
+    @staticmethod
+    def _intern(value, names, ids):
+        value_id = ids.get(value)
+        if value_id is None:
+            value_id = len(names)
+            names.append(value)
+            ids[value] = value_id
+        return value_id
+
+    @staticmethod
+    def pack_mac(mac):
+        return int(mac.replace(":", ""), 16)
+
+    @staticmethod
+    def unpack_mac(packed_mac):
+        mac = "%012x" % packed_mac
+        return ":".join([mac[i:i + 2] for i in range(0, 12, 2)])
+
+    def append(self, mac_type, vlan_id, mac, interface):
+        row = len(self._macs)
+        vlan_id = int(vlan_id)
+
+        port_id = self._port_ids.get(interface)
+        if port_id is None:
+            port_id = self._intern(interface, self._port_names, self._port_ids)
+            self._port_index[port_id] = array('I')
+        type_id = self._type_ids.get(mac_type)
+        if type_id is None:
+            type_id = self._intern(mac_type, self._type_names, self._type_ids)
+
+        self._macs.append(self.pack_mac(mac))
+        self._vlans.append(vlan_id)
+        self._ports.append(port_id)
+        self._types.append(type_id)
+
+        self._port_index[port_id].append(row)
+        vlan_rows = self._vlan_index.get(vlan_id)
+        if vlan_rows is None:
+            vlan_rows = self._vlan_index[vlan_id] = array('I')
+        vlan_rows.append(row)
+
+    def _row(self, row):
+        return dict(
+            mac_type=self._type_names[self._types[row]],
+            vlan_id=str(self._vlans[row]),
+            mac=self.unpack_mac(self._macs[row]),
+            interface=self._port_names[self._ports[row]]
+        )
+
+    def __len__(self):
+        return len(self._macs)
+
+    def __getitem__(self, row):
+        # Como una lista: un slice devuelve la lista de filas.
+        if isinstance(row, slice):
+            return [self._row(index)
+                    for index in range(*row.indices(len(self._macs)))]
+        if row < 0:
+            row += len(self._macs)
+        if not 0 <= row < len(self._macs):
+            raise IndexError("MacTable index out of range")
+        return self._row(row)
+
+    def __iter__(self):
+        for row in range(len(self._macs)):
+            yield self._row(row)
+
+    def ports(self):
+        return list(self._port_names)
+
+    def vlans(self):
+        return sorted(self._vlan_index)
+
+    def rows_for_port(self, interface):
+        port_id = self._port_ids.get(interface)
+        if port_id is None:
+            return []
+        return [self._row(row) for row in self._port_index[port_id]]
+
+    def rows_for_vlan(self, vlan_id):
+        return [self._row(row) for row in self._vlan_index.get(int(vlan_id), ())]
+
+    def macs_on_port(self, interface):
+        port_id = self._port_ids.get(interface)
+        if port_id is None:
+            return []
+        return [self.unpack_mac(self._macs[row])
+                for row in self._port_index[port_id]]
+
+    def to_json(self):
+        return list(self)
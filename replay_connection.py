@@ -0,0 +1,99 @@
+import os
+import re
+from logger import logger
+
+
+def recorded_output_path(replay_dir, mgmt_ip, information):
+    # <replay_dir>/<mgmt_ip>/<information>.txt, una entrada de
+    # _get_commands por archivo (por ejemplo cnfg_txt.txt).
+    return os.path.join(replay_dir, mgmt_ip, information + ".txt")
+
+
+def record_outputs(record_dir, mgmt_ip, sw_txt_information):
+    """Guarda las salidas crudas de un equipo para poder reproducirlas."""
+    os.makedirs(os.path.join(record_dir, mgmt_ip), exist_ok=True)
+    for information, show_content in sw_txt_information.items():
+        file_path = recorded_output_path(record_dir, mgmt_ip, information)
+        with open(file_path, "w") as outfile:
+            outfile.write(show_content)
+
+
+class ReplayConnection():
+    """Conexion que reproduce salidas grabadas en lugar de un equipo real.
+
+    Expone la misma API de ConnectHandler que usan los equipos Transition
+    (send_command, write_channel/read_channel, send_config_set, ...) y
+    responde cada comando show con el archivo grabado correspondiente, de
+    forma que todo el flujo de run_script.py corre sin tocar la red. La
+    configuracion enviada no se aplica: solo se devuelve como salida.
+    """
+
+    HOSTNAME_PATTERN = re.compile(r'^hostname (\S+)', flags=re.MULTILINE)
+
+    def __init__(self, replay_dir, mgmt_ip, commands):
+        self.replay_dir = replay_dir
+        self.mgmt_ip = mgmt_ip
+        # Comando show -> "information" de _get_commands.
+        self.commands = commands
+        self._outputs = {}
+        self._channel = ""
+        self._prompt = None
+
+        if not os.path.isdir(os.path.join(replay_dir, mgmt_ip)):
+            raise FileNotFoundError(
+                f"No hay salidas grabadas del equipo {mgmt_ip} en {replay_dir}")
+
+    def _read_output(self, command):
+        information = self.commands.get(command.strip())
+        if information is None:
+            return ""
+        if information not in self._outputs:
+            file_path = recorded_output_path(
+                self.replay_dir, self.mgmt_ip, information)
+            try:
+                with open(file_path, "r") as infile:
+                    self._outputs[information] = infile.read()
+            except FileNotFoundError:
+                logger.info(f"Salida grabada no encontrada: {file_path}")
+                self._outputs[information] = ""
+        return self._outputs[information]
+
+    def find_prompt(self):
+        if self._prompt is None:
+            # El prompt se arma con el hostname del running-config grabado.
+            hostname = self.HOSTNAME_PATTERN.search(
+                self._read_output("show running-config"))
+            self._prompt = (
+                hostname.group(1) if hostname else self.mgmt_ip) + "#"
+        return self._prompt
+
+    def send_command(self, command, **kwargs):
+        return self._read_output(command)
+
+    def write_channel(self, data):
+        # Cada comando se responde como lo haria el equipo: eco, salida y
+        # el prompt, sobre el que queda el eco del comando siguiente.
+        prompt = self.find_prompt()
+        for command in data.split("\n"):
+            if command.strip():
+                self._channel += (
+                    f"{command}\n{self._read_output(command)}\n{prompt}")
+
+    def read_channel(self):
+        data, self._channel = self._channel, ""
+        return data
+
+    def clear_buffer(self):
+        self._channel = ""
+
+    def disable_paging(self, command="terminal length 0", **kwargs):
+        return ""
+
+    def send_config_set(self, config_commands, **kwargs):
+        return "\n".join(config_commands)
+
+    def is_alive(self):
+        return True
+
+    def disconnect(self):
+        self._channel = ""
@@ -0,0 +1,114 @@
+import json
+import sqlite3
+import datetime
+import threading
+
+
+class RunJournal():
+    """Registro durable del avance de una ejecucion (SQLite en modo WAL).
+
+    Por cada equipo se guarda la ultima etapa alcanzada: collected,
+    collect_failed, planned, skipped (sin configuracion a aplicar),
+    deployed o deploy_failed, con los datos necesarios para retomar (el
+    hostname y los puertos tomados). Cada registro se confirma al
+    momento, de forma que si la ejecucion se corta se puede retomar con
+    --resume sin repetir el trabajo ya terminado.
+    """
+
+    # Etapas en las que la toma de informacion del equipo ya esta hecha.
+    COLLECTED_PHASES = (
+        "collected", "planned", "skipped", "deployed", "deploy_failed")
+    # Etapas en las que no queda nada por hacer en el equipo.
+    DONE_PHASES = ("skipped", "deployed")
+
+    def __init__(self, file_path="run_journal.db"):
+        self.file_path = file_path
+        self.run_id = None
+        self._lock = threading.Lock()
+        # Los workers del deploy registran su resultado desde otros hilos.
+        self._conn = sqlite3.connect(file_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                " run_id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " input_hash TEXT NOT NULL,"
+                " started_at TEXT NOT NULL,"
+                " finished_at TEXT)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS devices ("
+                " run_id INTEGER NOT NULL,"
+                " mgmt_ip TEXT NOT NULL,"
+                " phase TEXT NOT NULL,"
+                " payload TEXT,"
+                " updated_at TEXT NOT NULL,"
+                " PRIMARY KEY (run_id, mgmt_ip))")
+
+    @staticmethod
+    def _now():
+        return datetime.datetime.now().isoformat(timespec="seconds")
+
+    def start_run(self, input_hash):
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (input_hash, started_at) VALUES (?, ?)",
+                (input_hash, self._now()))
+        self.run_id = cursor.lastrowid
+        return self.run_id
+
+    def resume_run(self, input_hash):
+        """Retoma la ultima ejecucion sin terminar con la misma entrada.
+
+        Devuelve el run_id, o None si no hay ninguna para retomar.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id FROM runs"
+                " WHERE finished_at IS NULL AND input_hash = ?"
+                " ORDER BY run_id DESC LIMIT 1",
+                (input_hash,)).fetchone()
+        self.run_id = row[0] if row else None
+        return self.run_id
+
+    def record(self, mgmt_ip, phase, payload=None):
+        with self._lock, self._conn:
+            if payload is None:
+                # Se conservan los datos de la etapa anterior.
+                self._conn.execute(
+                    "INSERT INTO devices"
+                    " (run_id, mgmt_ip, phase, updated_at)"
+                    " VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (run_id, mgmt_ip) DO UPDATE SET"
+                    " phase = excluded.phase,"
+                    " updated_at = excluded.updated_at",
+                    (self.run_id, mgmt_ip, phase, self._now()))
+            else:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO devices"
+                    " (run_id, mgmt_ip, phase, payload, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (self.run_id, mgmt_ip, phase, json.dumps(payload),
+                     self._now()))
+
+    def device_states(self):
+        """mgmt_ip -> {"phase": ..., "payload": ...} de la ejecucion."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT mgmt_ip, phase, payload FROM devices"
+                " WHERE run_id = ?", (self.run_id,)).fetchall()
+        return {
+            mgmt_ip: dict(
+                phase=phase,
+                payload=json.loads(payload) if payload else None)
+            for mgmt_ip, phase, payload in rows
+        }
+
+    def finish_run(self):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ? WHERE run_id = ?",
+                (self._now(), self.run_id))
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,88 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+
+class RunMetrics():
+    """Metricas estructuradas de una ejecucion, por equipo y por comando.
+
+    Cada medicion es un evento (connect, command, parse, json_write,
+    retrieve, deploy, ...) con el mgmt_ip del equipo, etiquetas como el
+    comando o el metodo de parseo, y valores numericos (seconds, bytes,
+    retries, ...). Al final de la ejecucion se escriben como JSON lines
+    (un evento por linea) y como textfile de Prometheus, con los valores
+    sumados por equipo y etiqueta.
+    """
+
+    # Campos de texto que se usan como etiquetas en Prometheus.
+    LABEL_FIELDS = ("command", "method")
+
+    def __init__(self):
+        self._events = []
+        self._lock = threading.Lock()
+
+    def record(self, mgmt_ip, event, **fields):
+        entry = {"timestamp": time.time(), "mgmt_ip": mgmt_ip, "event": event}
+        entry.update(fields)
+        with self._lock:
+            self._events.append(entry)
+
+    @contextmanager
+    def timer(self, mgmt_ip, event, **fields):
+        """Registra el evento con los segundos que dura el bloque.
+
+        El diccionario entregado permite agregar campos (bytes, ok, ...)
+        desde dentro del bloque.
+        """
+        start_time = time.monotonic()
+        try:
+            yield fields
+        finally:
+            fields['seconds'] = time.monotonic() - start_time
+            self.record(mgmt_ip, event, **fields)
+
+    def events(self):
+        with self._lock:
+            return list(self._events)
+
+    def write_jsonl(self, file_path):
+        with open(file_path, "w") as outfile:
+            for entry in self.events():
+                outfile.write(json.dumps(entry) + "\n")
+
+    def _aggregate(self):
+        # (nombre de la metrica, etiquetas) -> suma de los valores.
+        samples = {}
+        for entry in self.events():
+            labels = [("mgmt_ip", entry['mgmt_ip'])] + [
+                (field, entry[field]) for field in self.LABEL_FIELDS
+                if entry.get(field) is not None
+            ]
+            for field, value in entry.items():
+                if field == "timestamp" or not isinstance(
+                        value, (int, float)):
+                    continue
+                key = (f"normalizer_{entry['event']}_{field}", tuple(labels))
+                samples[key] = samples.get(key, 0) + value
+        return samples
+
+    def write_prometheus(self, file_path):
+        lines = []
+        metric_name = None
+        for (name, labels), value in sorted(self._aggregate().items()):
+            if name != metric_name:
+                metric_name = name
+                lines.append(f"# TYPE {name} gauge")
+            label_txt = ",".join([
+                '{}="{}"'.format(label, str(label_value).replace('"', '\\"'))
+                for label, label_value in labels
+            ])
+            lines.append(f"{name}{{{label_txt}}} {float(value)}")
+
+        # Escritura atomica: el node_exporter nunca lee un archivo a medias.
+        tmp_path = file_path + ".tmp"
+        with open(tmp_path, "w") as outfile:
+            outfile.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, file_path)
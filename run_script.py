@@ -1,13 +1,34 @@
+import argparse
+import asyncio
 import logging
 import datetime
 import json
+import time
 import csv
+import os
 import sys
-import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from device_models import DEVICE_MODEL
 from device_factory import create_device
+from transition_device import COLLECTION_PROFILES
 from getpass import getpass
 from logger import logger
+from logger import configure_logging
+from logger import device_log_context
+from session_manager import SessionManager
+from deploy_scheduler import WaveScheduler
+from deploy_pipeline import DevicePipeline
+from timing_calibration import TimingCalibration
+from serialization import json_default
+from inventory_index import InventoryIndex
+from run_metrics import RunMetrics
+from backup_store import BackupStore
+from run_journal import RunJournal
+from fleet_store import FleetStore
+from mac_locator import MacLocator
+from config_renderer import free_port_template
+from config_renderer import render_interface_config
 
 
 def read_json_file(file_path):
@@ -44,53 +65,112 @@ def remove_duplicates_by_key(data, key):
             unique_data.append(item)
     return unique_data
 
-def config_interface_template(interface_name: str, device_model_id: str):
-    if device_model_id == "1":
-        config = [
-            f"interface {interface_name}",
-            "shutdown",
-            "no switchport mode access",
-            "no switchport mode hybrid",
-            "no switchport trunk native vlan",
-            "no switchport trunk allowed vlan",
-            "no switchport hybrid allowed vlan",
-            "no switchport hybrid native vlan",
-            "description LIBRE",
-            "switchport mode trunk",
-            "switchport trunk native vlan 4000",
-            "switchport trunk allowed vlan 4000",
-            "no spanning-tree",
-            "loop-protect",
-            "loop-protect action shutdown log trap",
-            "qos storm broadcast 10 mbps",
-            "qos storm unknown 10 mbps",
-            "exit"
-        ]
-    else:
-        config = [
-            f"interface {interface_name}",
-            "shutdown",
-            "no switchport mode access",
-            "no switchport mode hybrid",
-            "no switchport trunk native vlan",
-            "no switchport trunk allowed vlan",
-            "no switchport hybrid allowed vlan",
-            "no switchport hybrid native vlan",
-            "description LIBRE",
-            "switchport mode trunk",
-            "switchport trunk native vlan 4000",
-            "switchport trunk allowed vlan 4000",
-            "no spanning-tree",
-            "loop-protect",
-            "loop-protect action shutdown log",
-            "qos storm broadcast 10 mbps",
-            "qos storm unknown 10 mbps",
-            "exit"
-        ]
-
-    return config
-
-device_delay = 15
+parser = argparse.ArgumentParser(description="Network Configuration Normalizer")
+parser.add_argument(
+    "--collect-workers", type=int, default=8,
+    help="Cantidad de equipos consultados en paralelo durante la toma de informacion (default: 8)")
+parser.add_argument(
+    "--transport", choices=["netmiko", "asyncssh", "replay"], default="netmiko",
+    help="Backend SSH: netmiko (un hilo por equipo), asyncssh (un unico event loop) "
+         "o replay (salidas grabadas en --replay-dir, sin conectarse a los equipos)")
+parser.add_argument(
+    "--session-idle-timeout", type=int, default=600,
+    help="Segundos que una sesion SSH puede quedar ociosa entre la toma de informacion y el deploy (default: 600)")
+parser.add_argument(
+    "--no-session-reuse", action="store_true",
+    help="Abre una sesion SSH nueva para el deploy en lugar de reutilizar la de la toma de informacion")
+parser.add_argument(
+    "--exec-mode", choices=["delay", "prompt", "pipelined", "streaming"],
+    default="delay",
+    help="delay: usa global_delay_factor de netmiko; prompt: lee hasta el prompt con timeouts calibrados por equipo; "
+         "pipelined: envia todos los show en un unico intercambio; "
+         "streaming: parsea las salidas linea a linea mientras llegan del canal")
+parser.add_argument(
+    "--calibration-file", default="timing_calibration.json",
+    help="Archivo donde se guardan los timeouts calibrados de los modos prompt, pipelined y streaming (default: timing_calibration.json)")
+parser.add_argument(
+    "--canary-size", type=int, default=1,
+    help="Cantidad de equipos de la primera ola (canary) del deploy (default: 1)")
+parser.add_argument(
+    "--wave-size", type=int, default=10,
+    help="Cantidad de equipos por ola luego del canary (default: 10)")
+parser.add_argument(
+    "--wave-parallelism", type=int, default=5,
+    help="Equipos configurados en paralelo dentro de cada ola (default: 5)")
+parser.add_argument(
+    "--soak-time", type=int, default=15,
+    help="Segundos de espera entre olas (default: 15)")
+parser.add_argument(
+    "--max-failure-rate", type=float, default=0.25,
+    help="Porcentaje de fallas (0 a 1) de una ola a partir del cual se detiene el deploy (default: 0.25)")
+parser.add_argument(
+    "--legacy-vlan-lists", action="store_true",
+    help="Guarda las VLAN de cada interfaz y los rangos de VLAN como listas de enteros expandidas (formato anterior)")
+parser.add_argument(
+    "--replay-dir", default="replay",
+    help="Directorio con las salidas grabadas (<mgmt_ip>/<salida>.txt) que usa el transporte replay (default: replay)")
+parser.add_argument(
+    "--record-dir",
+    help="Graba las salidas crudas de cada equipo en este directorio, en el formato que lee el transporte replay")
+parser.add_argument(
+    "--metrics-dir",
+    help="Guarda en este directorio el reporte de tiempos y tamanos por equipo y por comando "
+         "(JSON lines y textfile de Prometheus)")
+parser.add_argument(
+    "--log-queue", action="store_true",
+    help="Escribe los logs desde un hilo en segundo plano (QueueHandler/QueueListener) para no bloquear a los workers")
+parser.add_argument(
+    "--log-json", action="store_true",
+    help="Escribe el archivo de log como JSON lines (output_log.jsonl) con mgmt_ip, hostname y etapa de cada registro")
+parser.add_argument(
+    "--backup-store",
+    help="Guarda los backups en este almacen comprimido y deduplicado en lugar de "
+         "backup_configuration/hostname_fecha.json/.conf")
+parser.add_argument(
+    "--profile", choices=list(COLLECTION_PROFILES), default="normalization",
+    help="Comandos a ejecutar en cada equipo. normalization (default): running-config, estado de "
+         "interfaces y version, lo necesario para normalizar y respaldar la configuracion; "
+         "full-backup: todos los comandos")
+parser.add_argument(
+    "--journal", default="run_journal.db",
+    help="Base SQLite donde se registra el avance de la ejecucion por equipo (default: run_journal.db)")
+parser.add_argument(
+    "--resume", action="store_true",
+    help="Retoma la ultima ejecucion sin terminar del mismo archivo de entrada: no vuelve a tomar "
+         "informacion de los equipos ya tomados ni a configurar los ya configurados")
+parser.add_argument(
+    "--pipeline", action="store_true",
+    help="Planifica y aplica la configuracion de cada equipo apenas se toma su informacion, "
+         "sin esperar al resto (toma de informacion y deploy solapados)")
+parser.add_argument(
+    "--deploy-workers", type=int, default=5,
+    help="Con --pipeline, cantidad de equipos configurados en paralelo (default: 5)")
+parser.add_argument(
+    "--queue-size", type=int, default=16,
+    help="Con --pipeline, cantidad maxima de equipos en espera entre una etapa y la siguiente (default: 16)")
+parser.add_argument(
+    "--fleet-store",
+    help="Carga el snapshot de cada equipo en esta base SQLite con indices, para consultar "
+         "puertos, VLAN, MAC y versiones de toda la flota (ver fleet_store.py)")
+parser.add_argument(
+    "--mac-index",
+    help="Agrega la tabla de MAC de cada equipo (sin los puertos de uplink) a este indice SQLite "
+         "para ubicar CPEs por MAC (ver mac_locator.py). Requiere --profile full-backup")
+args = parser.parse_args()
+configure_logging(use_queue=args.log_queue, json_lines=args.log_json)
+if args.collect_workers < 1:
+    parser.error("--collect-workers debe ser mayor o igual a 1")
+if args.wave_size < 1 or args.wave_parallelism < 1:
+    parser.error("--wave-size y --wave-parallelism deben ser mayores o iguales a 1")
+if args.deploy_workers < 1 or args.queue_size < 1:
+    parser.error("--deploy-workers y --queue-size deben ser mayores o iguales a 1")
+if args.pipeline and args.transport == "asyncssh":
+    parser.error("--pipeline no esta disponible con --transport asyncssh: la toma de informacion usa un unico event loop")
+if args.mac_index and "mac_add_txt" not in COLLECTION_PROFILES[args.profile]:
+    parser.error(f"--mac-index necesita la tabla de MAC, que no se toma con --profile {args.profile}")
+if args.record_dir and args.exec_mode == "streaming":
+    parser.error("--record-dir no esta disponible en modo streaming: las salidas no se guardan completas")
+
 file_path = 'input_information/data.csv'
 logger.info(f"- Leyendo informacion de archivo: {file_path}")
 csv_data = read_csv_file(file_path)
@@ -99,72 +179,364 @@ logger.info(f"- Informacion cruda: {csv_data}")
 for iface in csv_data:
     logger.info(f"\t - IP Mgmt: {iface['mgmt_ip']} | Device: {DEVICE_MODEL[iface['device_model_id']]['model']} | Port: GigabitEthernet 1/{iface['port_number']}")
 unique_data = remove_duplicates_by_key(csv_data, 'mgmt_ip')
+inventory_index = InventoryIndex(csv_data)
 
-logger.info(f"- Leyendo credenciales de archivo 'credentials.json'...")
-credentials = read_json_file("credentials.json")
+# Solo se retoma una ejecucion con el mismo archivo de entrada y el mismo
+# transporte: lo aplicado en una corrida con replay no existe en los equipos.
+input_hash = hashlib.sha256(json.dumps({
+    "csv_data": csv_data,
+    "transport": args.transport,
+    "replay_dir": (os.path.abspath(args.replay_dir)
+                   if args.transport == "replay" else None)
+}, sort_keys=True).encode("utf-8")).hexdigest()
+run_journal = RunJournal(args.journal)
+if args.resume and run_journal.resume_run(input_hash):
+    logger.info(f"- Retomando la ejecucion {run_journal.run_id} registrada en {args.journal}.")
+else:
+    if args.resume:
+        logger.info(f"- No hay una ejecucion sin terminar para {file_path} en {args.journal}, se inicia una nueva.")
+    run_journal.start_run(input_hash)
+journal_states = run_journal.device_states()
+
+if args.transport == "replay":
+    # Las salidas grabadas no requieren credenciales.
+    credentials = {'username': None, 'password': None}
+else:
+    logger.info(f"- Leyendo credenciales de archivo 'credentials.json'...")
+    credentials = read_json_file("credentials.json")
 
-if credentials:
+if credentials is None:
+    logger.info(f"- Credenciales no encontradas en archivo 'credentials.json'. Ingrese sus credenciales:")
+    credentials = {}
+    credentials['username'] = input("- Usuario: ")
+    credentials['password'] = getpass()
+elif args.transport != "replay":
     if not credentials.get("username", False):
         logger.info(f"- Key 'username' faltante en archivo 'credentials.json'. Ingrese el usurio:")
         credentials['username'] = input("- Usuario: ")
     if not credentials.get("password", False):
         logger.info(f"- Key 'password' faltante en archivo 'credentials.json'. Ingrese la constraseña:")
         credentials['password'] = getpass()
-else:
-    logger.info(f"- Credenciales no encontradas en archivo 'credentials.json'. Ingrese sus credenciales:")
-    credentials = {}
-    credentials['username'] = input("- Usuario: ")
-    credentials['password'] = getpass()
 
 logger.info(f"- Se procedera a ejecutar la lectura de configuracion de los equipo informados en el archivo.")
 
 failed_devices = []
 config_change_ports = []
-logger.info(f"- Tomando informacion de los dispositivos...")
-for data in unique_data:
-    try:
-        logger.info("#" * 30)
-
-        node = {
-            "device_model_id": data['device_model_id'],
-            "device_model": DEVICE_MODEL[data['device_model_id']],
-            "mgmt_ip": data['mgmt_ip'],
-            "credentials": credentials
-        }
-        sw = create_device(**node)
-        timestamp = ('{:%d-%m-%Y_%H_%M_%S}'.format(datetime.datetime.now()))
-        result = sw.retrieve_information()
-        if result:
-            json_object = json.dumps(result, indent=4)
-            file_name = "_".join([result['hostname'], timestamp])
-
-            with open("backup_configuration/" + file_name + ".json", "w") as outfile:
-                outfile.write(json_object)
 
+# El pool de sesiones solo aplica al transporte netmiko: la sesion abierta
+# durante la toma de informacion se reutiliza en el deploy.
+session_manager = None
+if args.transport == "netmiko" and not args.no_session_reuse:
+    session_manager = SessionManager(idle_timeout=args.session_idle_timeout)
+
+# Con replay los tiempos no son del equipo real: no se calibra.
+timing_calibration = None
+if (args.exec_mode in ("prompt", "pipelined", "streaming") and
+        args.transport != "replay"):
+    timing_calibration = TimingCalibration(args.calibration_file)
+
+run_metrics = RunMetrics() if args.metrics_dir else None
+backup_store = BackupStore(args.backup_store) if args.backup_store else None
+fleet_store = FleetStore(args.fleet_store) if args.fleet_store else None
+mac_locator = MacLocator(args.mac_index) if args.mac_index else None
+
+device_options = {
+    "transport": args.transport,
+    "session_manager": session_manager,
+    "exec_mode": args.exec_mode,
+    "timing_calibration": timing_calibration,
+    "legacy_vlan_lists": args.legacy_vlan_lists,
+    "replay_dir": args.replay_dir if args.transport == "replay" else None,
+    "record_dir": args.record_dir,
+    "metrics": run_metrics,
+    "collection_profile": args.profile
+}
+
+
+def build_node(data):
+    return {
+        "device_model_id": data['device_model_id'],
+        "device_model": DEVICE_MODEL[data['device_model_id']],
+        "mgmt_ip": data['mgmt_ip'],
+        "credentials": credentials
+    }
+
+
+def journal_collect_result(data, node):
+    # Las credenciales nunca se guardan en el journal.
+    if node:
+        run_journal.record(data['mgmt_ip'], "collected", dict(
+            hostname=node['hostname'], interfaces=node['interfaces']))
+    else:
+        run_journal.record(data['mgmt_ip'], "collect_failed")
+
+
+def process_result(data, node, timestamp, result):
+    # Guarda el backup del equipo y arma el nodo con los puertos a normalizar.
+    if not result:
+        logger.error(f"No hay datos disponibles del equipo {data['mgmt_ip']}.")
+        return None
+
+    # El backup necesita todas las secciones del snapshot: se parsean aca,
+    # fuera de la medicion del tiempo de escritura. Los indices y el nodo
+    # leen el mismo snapshot, con las secciones ya parseadas.
+    backup = result.to_dict()
+
+    # Segun el perfil de recoleccion puede no haber running-config.
+    cnfg_txt = result.get('configuration', {}).get('cnfg_txt')
+
+    start_time = time.monotonic()
+    if backup_store:
+        # Solo se escribe lo que cambio desde el ultimo backup del equipo.
+        version = backup_store.store(
+            data['mgmt_ip'], result['hostname'], cnfg_txt or "", backup)
+        written_bytes = version['written_bytes']
+        if not written_bytes:
+            logger.info(f"- Sin cambios en el backup del equipo {result['hostname']} - {data['mgmt_ip']}.")
+    else:
+        json_object = json.dumps(backup, indent=4, default=json_default)
+        file_name = "_".join([result['hostname'], timestamp])
+
+        with open("backup_configuration/" + file_name + ".json", "w") as outfile:
+            outfile.write(json_object)
+
+        if cnfg_txt is not None:
             with open("backup_configuration/" + file_name + ".conf", "w") as outfile:
-                outfile.write(result['configuration']['cnfg_txt'])
-
-            node['interfaces'] = []
-            for interfc in csv_data:
-                if interfc['mgmt_ip'] == data['mgmt_ip']:
-                    node['hostname'] = result['hostname']
-                    for if_status in result['interface_status']['interfaces']:
-                        csv_if_name = f"GigabitEthernet 1/{interfc['port_number']}"
-                        if if_status['interface_full_name'] == csv_if_name:
-                            node['interfaces'].append(
-                                dict(
-                                    interface_full_name=if_status['interface_full_name'],
-                                    link_state=if_status['link_state']
-                                )
-                            )
-            config_change_ports.append(node)
+                outfile.write(cnfg_txt)
+        written_bytes = len(json_object)
+
+    if run_metrics:
+        run_metrics.record(
+            data['mgmt_ip'], "json_write",
+            seconds=time.monotonic() - start_time, bytes=written_bytes)
+
+    # Los indices son opcionales: un error al cargarlos no invalida la toma
+    # de informacion del equipo.
+    if fleet_store:
+        # Se escribe por lotes, en una unica transaccion cada uno.
+        try:
+            fleet_store.add(result)
+        except Exception as e:
+            logger.error(f"No se pudo cargar el equipo {data['mgmt_ip']} en {args.fleet_store}: {e}")
+
+    if mac_locator:
+        try:
+            mac_locator.add(result)
+        except Exception as e:
+            logger.error(f"No se pudo cargar la tabla de MAC del equipo {data['mgmt_ip']} en {args.mac_index}: {e}")
+
+    node['hostname'] = result['hostname']
+    node['interfaces'] = [
+        dict(
+            interface_full_name=if_status['interface_full_name'],
+            link_state=if_status['link_state']
+        )
+        for if_status in inventory_index.requested_interfaces(
+            data['mgmt_ip'], result['interface_status']['interfaces'])
+    ]
+    return node
+
+
+def collect_device(data):
+    # Se ejecuta dentro de un worker: devuelve el nodo a normalizar (o None)
+    # y el hilo principal lo agrega. Solo el journal (con lock) es compartido.
+    with device_log_context(mgmt_ip=data['mgmt_ip'], phase="collect"):
+        try:
+            node = build_node(data)
+            sw = create_device(**device_options, **node)
+            timestamp = ('{:%d-%m-%Y_%H_%M_%S}'.format(datetime.datetime.now()))
+            result = sw.retrieve_information()
+            node = process_result(data, node, timestamp, result)
+        except Exception as e:
+            logger.error(f"Error al intentar tomar la configuracion sobre el equipo {data['mgmt_ip']}: {e}")
+            node = None
+        journal_collect_result(data, node)
+        return node
+
+
+async def collect_device_async(data, semaphore):
+    async with semaphore:
+        with device_log_context(mgmt_ip=data['mgmt_ip'], phase="collect"):
+            try:
+                node = build_node(data)
+                sw = create_device(**device_options, **node)
+                timestamp = ('{:%d-%m-%Y_%H_%M_%S}'.format(datetime.datetime.now()))
+                result = await sw.retrieve_information()
+                node = process_result(data, node, timestamp, result)
+            except Exception as e:
+                logger.error(f"Error al intentar tomar la configuracion sobre el equipo {data['mgmt_ip']}: {e}")
+                node = None
+            journal_collect_result(data, node)
+            return node
+
+
+async def collect_all_async(pending_data):
+    semaphore = asyncio.Semaphore(args.collect_workers)
+    nodes = await asyncio.gather(
+        *(collect_device_async(data, semaphore) for data in pending_data))
+    return {data['mgmt_ip']: node for data, node in zip(pending_data, nodes)}
+
+
+def plan_device_config(if_cnfig):
+    interface_templates = []
+    for port in if_cnfig['interfaces']:
+
+        if port['link_state'] != "Down":
+            logger.info(f"\t - La interfaz {port['interface_full_name']} esta UP, por lo que no se cambiara la configuracion!!!!")
         else:
-            failed_devices.append(data)
-            logger.error("No hay datos disponibles del equipo.")
-    except Exception as e:
-        logger.error(f"Error al intentar tomar la configuracion sobre el equipo {data['mgmt_ip']}: {e}")
+            logger.info(f"\t - Creando configuracion de interfaz {port['interface_full_name']}")
+            interface_templates.append((
+                port['interface_full_name'],
+                free_port_template(if_cnfig['device_model_id'])))
+
+    # Los puertos con el mismo template se configuran en un unico bloque
+    # "interface GigabitEthernet 1/3,5-7".
+    interface_config = render_interface_config(interface_templates)
+
+    if interface_config:
+        interface_config.extend(["end", "copy run start"])
+
+    return interface_config
+
+
+def log_port_status(if_cnfig):
+    for port in if_cnfig['interfaces']:
+        logger.info(f"\t -IP Mgmt: {if_cnfig['mgmt_ip']} | Hostname: {if_cnfig['hostname']} | Puerto {port['interface_full_name']} | Estado del puerto: {port['link_state']}")
+
+
+def plan_node(if_cnfig):
+    # Devuelve el item de deploy del equipo, o None si no hay nada que aplicar.
+    logger.info("----" * 30)
+    logger.info(f"-- Equipo {if_cnfig['hostname']} - {if_cnfig['mgmt_ip']}")
+    state = journal_states.get(if_cnfig['mgmt_ip'])
+    if state and state['phase'] in RunJournal.DONE_PHASES:
+        logger.info(f"-- El equipo {if_cnfig['hostname']} - {if_cnfig['mgmt_ip']} ya fue procesado en la ejecucion anterior.")
+        return None
+    interface_config = plan_device_config(if_cnfig)
+    if interface_config:
+        run_journal.record(if_cnfig['mgmt_ip'], "planned")
+        return if_cnfig, interface_config
+    logger.info(f"-- No existe configuracion a aplicar en equipo {if_cnfig['hostname']} - {if_cnfig['mgmt_ip']}.")
+    run_journal.record(if_cnfig['mgmt_ip'], "skipped")
+    return None
+
+
+def deploy_device(deploy_item):
+    # Devuelve (exito, filas para errors_aplicando_config.csv).
+    if_cnfig, interface_config = deploy_item
+    with device_log_context(mgmt_ip=if_cnfig['mgmt_ip'], hostname=if_cnfig['hostname'], phase="deploy"):
+        try:
+            node = build_node(if_cnfig)
+            sw = create_device(**device_options, **node)
+
+            logger.info(f"-- Aplicando configuracion en equipo {if_cnfig['hostname']} - {if_cnfig['mgmt_ip']}.")
+
+            # Aca esta el metodo que aplica la config!!:
+            deploy_result = sw.deploy_configuration(interface_config)
+            if args.transport == "asyncssh":
+                deploy_result = asyncio.run(deploy_result)
+            if session_manager:
+                session_manager.close(if_cnfig['mgmt_ip'])
+
+            if deploy_result:
+                logger.info(f"-- Configuracion aplicada correctamente en el equipo {if_cnfig['hostname']} - {if_cnfig['mgmt_ip']}.")
+                run_journal.record(if_cnfig['mgmt_ip'], "deployed")
+                return True, []
+            run_journal.record(if_cnfig['mgmt_ip'], "deploy_failed")
+
+            port = if_cnfig['interfaces'][-1]
+            logger.error(f"No se logro aplicar la configuracion sobre el equipo {if_cnfig['hostname']} - {if_cnfig['mgmt_ip']} - Port {port['interface_full_name']}")
+            return False, [
+                dict(
+                    device_model_id=if_cnfig['device_model_id'],
+                    mgmt_ip=if_cnfig['mgmt_ip'],
+                    port_number=port['interface_full_name'].replace("GigabitEthernet 1/", "")
+                )
+            ]
+        except Exception as e:
+            logger.error(f"Error al intentar aplicar la configuracion sobre el equipo {if_cnfig['mgmt_ip']}: {e}")
+            run_journal.record(if_cnfig['mgmt_ip'], "deploy_failed")
+            return False, []
+
+
+# Equipos ya tomados en la ejecucion que se retoma: el nodo se arma con lo
+# registrado en el journal, sin conectarse al equipo.
+resumed = {}
+pending_data = []
+for data in unique_data:
+    state = journal_states.get(data['mgmt_ip'])
+    if state and state['phase'] in RunJournal.COLLECTED_PHASES:
+        resumed[data['mgmt_ip']] = dict(build_node(data), **state['payload'])
+    else:
+        pending_data.append(data)
+if resumed:
+    logger.info(f"- {len(resumed)} equipo(s) ya tomados en la ejecucion anterior, no se vuelven a consultar.")
+
+deploy_results = []
+not_deployed = []
+
+if args.pipeline:
+    logger.info(
+        f"- Procesando los dispositivos en pipeline ({args.collect_workers} workers de toma de informacion, "
+        f"{args.deploy_workers} de deploy, transporte {args.transport})...")
+    collected = {}
+
+    def pipeline_collect(data):
+        if data['mgmt_ip'] in resumed:
+            return resumed[data['mgmt_ip']]
+        return collect_device(data)
+
+    def pipeline_plan(data, node):
+        # Corre en el unico hilo de planificacion: no necesita lock.
+        collected[data['mgmt_ip']] = node
+        if not node:
+            return None
+        log_port_status(node)
+        deploy_item = plan_node(node)
+        # Solo queda abierta la sesion de los equipos con deploy pendiente.
+        if deploy_item is None and session_manager:
+            session_manager.close(data['mgmt_ip'])
+        return deploy_item
+
+    pipeline = DevicePipeline(
+        collect_workers=args.collect_workers,
+        deploy_workers=args.deploy_workers,
+        queue_size=args.queue_size,
+        canary_size=args.canary_size,
+        soak_time=args.soak_time,
+        max_failure_rate=args.max_failure_rate
+    )
+    deploy_results, not_deployed = pipeline.run(
+        unique_data, pipeline_collect, pipeline_plan, deploy_device)
+else:
+    logger.info(f"- Tomando informacion de los dispositivos ({args.collect_workers} workers, transporte {args.transport})...")
+    if args.transport == "asyncssh":
+        collected = asyncio.run(collect_all_async(pending_data))
+    else:
+        with ThreadPoolExecutor(max_workers=args.collect_workers) as executor:
+            futures = {executor.submit(collect_device, data): data for data in pending_data}
+            # Los resultados se juntan en el hilo principal, por lo que las listas
+            # no necesitan lock. Se respeta el orden del CSV en los resultados.
+            collected = {}
+            for future in as_completed(futures):
+                collected[futures[future]['mgmt_ip']] = future.result()
+    collected.update(resumed)
+
+if timing_calibration:
+    timing_calibration.save()
+
+for data in unique_data:
+    node = collected[data['mgmt_ip']]
+    if node:
+        config_change_ports.append(node)
+    else:
         failed_devices.append(data)
-        continue
+
+    # Solo conservamos abiertas las sesiones de los equipos que tienen
+    # puertos para normalizar.
+    if not args.pipeline and session_manager and not (node and any(
+            port['link_state'] == "Down" for port in node['interfaces'])):
+        session_manager.close(data['mgmt_ip'])
 
 
 create_csv_file(failed_devices, "error_tomando_info.csv")
@@ -172,67 +544,65 @@ create_csv_file(failed_devices, "error_tomando_info.csv")
 failed_config_devices = []
 
 if config_change_ports:
-    logger.info("###" * 30)
-    logger.info(f"- Estado actual de los puertos:")
-    for if_cnfig in config_change_ports:
-        for port in if_cnfig['interfaces']:
-            logger.info(f"\t -IP Mgmt: {if_cnfig['mgmt_ip']} | Hostname: {if_cnfig['hostname']} | Puerto {port['interface_full_name']} | Estado del puerto: {port['link_state']}")
-
-    logger.info("###" * 30)
-    logger.info(f"- Normalizando configuracion de los puertos..")
-    for if_cnfig in config_change_ports:
-        try:
-            logger.info("----" * 30)
-            logger.info(f"-- Equipo {if_cnfig['hostname']} - {if_cnfig['mgmt_ip']}")
-            node = {
-                "device_model_id": if_cnfig['device_model_id'],
-                "device_model": DEVICE_MODEL[if_cnfig['device_model_id']],
-                "mgmt_ip": if_cnfig['mgmt_ip'],
-                "credentials": credentials
-            }
-            sw = create_device(**node)
-            interface_config = []
-            for port in if_cnfig['interfaces']:
+    if not args.pipeline:
+        logger.info("###" * 30)
+        logger.info(f"- Estado actual de los puertos:")
+        for if_cnfig in config_change_ports:
+            log_port_status(if_cnfig)
+
+        logger.info("###" * 30)
+        logger.info(f"- Normalizando configuracion de los puertos..")
+        deploy_plan = []
+        for if_cnfig in config_change_ports:
+            deploy_item = plan_node(if_cnfig)
+            if deploy_item:
+                deploy_plan.append(deploy_item)
+
+        scheduler = WaveScheduler(
+            canary_size=args.canary_size,
+            wave_size=args.wave_size,
+            parallelism=args.wave_parallelism,
+            soak_time=args.soak_time,
+            max_failure_rate=args.max_failure_rate
+        )
+        deploy_results, not_deployed = scheduler.run(deploy_plan, deploy_device)
 
-                if port['link_state'] != "Down":
-                    logger.info(f"\t - La interfaz {port['interface_full_name']} esta UP, por lo que no se cambiara la configuracion!!!!")
-                else:
-                    logger.info(f"\t - Creando configuracion de interfaz {port['interface_full_name']}")
-                    config = config_interface_template(interface_name=port['interface_full_name'], device_model_id=if_cnfig['device_model_id'])
-                    interface_config.extend(config)
-
-            if interface_config:
-                interface_config.extend(["end", "copy run start"])
-
-                logger.info(f"-- Aplicando configuracion en equipo {if_cnfig['hostname']} - {if_cnfig['mgmt_ip']}.")
-
-                # Aca esta el metodo que aplica la config!!:
-                deploy_result = sw.deploy_configuration(interface_config)
-
-                if deploy_result:
-                    logger.info(f"-- Configuracion aplicada correctamente en el equipo {if_cnfig['hostname']} - {if_cnfig['mgmt_ip']}.")
-                    logger.info("#" * 30)
-                    logger.info(f"Esperando {device_delay} seg antes de aplicar la configuracion en el siguiente equipo.")
-                    time.sleep(device_delay)
-                else:
-                    logger.error(f"No se logro aplicar la configuracion sobre el equipo {if_cnfig['hostname']} - {if_cnfig['mgmt_ip']} - Port {port['interface_full_name']}")
-                    failed_config_devices.append(
+    for failed_rows in deploy_results:
+        failed_config_devices.extend(failed_rows)
+
+    if not_deployed:
+        not_deployed_ports = []
+        for if_cnfig, interface_config in not_deployed:
+            for port in if_cnfig['interfaces']:
+                if port['link_state'] == "Down":
+                    not_deployed_ports.append(
                         dict(
                             device_model_id=if_cnfig['device_model_id'],
                             mgmt_ip=if_cnfig['mgmt_ip'],
                             port_number=port['interface_full_name'].replace("GigabitEthernet 1/", "")
                         )
                     )
-            else:
-                logger.info(f"-- No existe configuracion a aplicar en equipo {if_cnfig['hostname']} - {if_cnfig['mgmt_ip']}.")
-        except Exception as e:
-            logger.error(f"Error al intentar aplicar la configuracion sobre el equipo {if_cnfig['mgmt_ip']}: {e}")
-            # failed_devices.append(
-            #     dict(
-            #         device_model_id=DEVICE_MODEL[if_cnfig['device_model_id']],
-            #         mgmt_ip=if_cnfig['mgmt_ip']
-            #     )
-            # )
-            continue
+            if session_manager:
+                session_manager.close(if_cnfig['mgmt_ip'])
+        create_csv_file(not_deployed_ports, "deploy_no_ejecutado.csv")
 
     create_csv_file(failed_config_devices, "errors_aplicando_config.csv")
+
+if session_manager:
+    session_manager.close_all()
+
+run_journal.finish_run()
+run_journal.close()
+
+if fleet_store:
+    fleet_store.close()
+
+if mac_locator:
+    mac_locator.close()
+
+if run_metrics:
+    os.makedirs(args.metrics_dir, exist_ok=True)
+    run_name = 'run_{:%d-%m-%Y_%H_%M_%S}'.format(datetime.datetime.now())
+    run_metrics.write_jsonl(os.path.join(args.metrics_dir, run_name + ".jsonl"))
+    run_metrics.write_prometheus(os.path.join(args.metrics_dir, "normalizer.prom"))
+    logger.info(f"- Reporte de metricas guardado en {args.metrics_dir}/{run_name}.jsonl")
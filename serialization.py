@@ -0,0 +1,10 @@
+def json_default(obj):
+    """Hook "default" de json.dumps para los tipos propios del proyecto.
+
+    Los objetos que implementan to_json() (por ejemplo VlanSet) se
+    serializan con el valor que devuelve ese metodo.
+    """
+    if hasattr(obj, "to_json"):
+        return obj.to_json()
+    raise TypeError(
+        f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,103 @@
+import time
+import threading
+from contextlib import contextmanager
+from logger import logger
+
+
+class SessionManager():
+    """Pool de sesiones SSH autenticadas, indexado por mgmt_ip.
+
+    Permite que la etapa de deploy reutilice la sesion abierta durante la
+    toma de informacion, evitando un segundo login (y una segunda consulta
+    AAA) por equipo. Un hilo en segundo plano envia keepalives a las
+    sesiones ociosas y cierra las que superan idle_timeout.
+    """
+
+    def __init__(self, idle_timeout=300, keepalive_interval=30):
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._keepalive_thread = threading.Thread(
+            target=self._keepalive_loop, daemon=True)
+        self._keepalive_thread.start()
+
+    def _get_entry(self, mgmt_ip):
+        with self._lock:
+            entry = self._sessions.get(mgmt_ip)
+            if entry is None:
+                entry = {
+                    "connection": None,
+                    "last_used": time.monotonic(),
+                    "lock": threading.Lock()
+                }
+                self._sessions[mgmt_ip] = entry
+            return entry
+
+    @contextmanager
+    def session(self, mgmt_ip, connect):
+        """Entrega la sesion del equipo, creandola con connect() si no existe.
+
+        La sesion se usa en exclusiva mientras dure el bloque with. Si el
+        bloque termina con una excepcion la sesion se descarta, ya que el
+        canal puede haber quedado en un estado desconocido.
+        """
+        entry = self._get_entry(mgmt_ip)
+        with entry["lock"]:
+            if entry["connection"] is None:
+                entry["connection"] = connect()
+            else:
+                logger.info(f"Reutilizando la sesion abierta con el equipo: {mgmt_ip}")
+            try:
+                yield entry["connection"]
+            except BaseException:
+                self._disconnect(entry)
+                raise
+            finally:
+                entry["last_used"] = time.monotonic()
+
+    def close(self, mgmt_ip):
+        with self._lock:
+            entry = self._sessions.pop(mgmt_ip, None)
+        if entry:
+            with entry["lock"]:
+                self._disconnect(entry)
+
+    def close_all(self):
+        self._stop.set()
+        with self._lock:
+            mgmt_ips = list(self._sessions)
+        for mgmt_ip in mgmt_ips:
+            self.close(mgmt_ip)
+
+    def _disconnect(self, entry):
+        net_connect = entry["connection"]
+        entry["connection"] = None
+        if net_connect:
+            try:
+                net_connect.disconnect()
+            except Exception as e:
+                logger.debug(f"Error al cerrar la sesion: {e}")
+
+    def _keepalive_loop(self):
+        while not self._stop.wait(self.keepalive_interval):
+            with self._lock:
+                sessions = list(self._sessions.items())
+
+            for mgmt_ip, entry in sessions:
+                # Si la sesion esta en uso no hace falta el keepalive.
+                if not entry["lock"].acquire(blocking=False):
+                    continue
+                try:
+                    if entry["connection"] is None:
+                        continue
+                    idle_time = time.monotonic() - entry["last_used"]
+                    if idle_time > self.idle_timeout:
+                        logger.info(f"Cerrando sesion ociosa con el equipo: {mgmt_ip}")
+                        self._disconnect(entry)
+                    elif not entry["connection"].is_alive():
+                        logger.info(f"La sesion con el equipo {mgmt_ip} se cerro. Se descarta.")
+                        self._disconnect(entry)
+                finally:
+                    entry["lock"].release()
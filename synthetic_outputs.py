@@ -0,0 +1,238 @@
+import random
+
+
+# Escala por defecto de las salidas sinteticas: un switch de 48+4 puertos
+# con muchas VLAN, trunks con rangos y una tabla de MAC grande.
+DEFAULT_SCALE = {
+    "ports": 48,
+    "ten_giga_ports": 4,
+    "vlans": 1000,
+    "trunk_ranges": 50,
+    "macs": 100000
+}
+
+
+def interface_names(ports=48, ten_giga_ports=4):
+    return (
+        [f"GigabitEthernet 1/{port}" for port in range(1, ports + 1)] +
+        [f"10GigabitEthernet 1/{port}"
+         for port in range(1, ten_giga_ports + 1)]
+    )
+
+
+def range_heavy_vlans(vlan_ids, trunk_ranges, rnd):
+    # Lista de VLAN de un trunk en formato "10,20-30,45-50,...", con
+    # trunk_ranges intervalos tomados de las VLAN existentes.
+    starts = sorted(rnd.sample(vlan_ids, min(trunk_ranges, len(vlan_ids))))
+    intervals = []
+    for number, start in enumerate(starts):
+        limit = starts[number + 1] - 1 if number + 1 < len(starts) else start
+        end = min(start + rnd.randint(0, 20), limit)
+        intervals.append(str(start) if start == end else f"{start}-{end}")
+    return ",".join(intervals)
+
+
+def running_config_output(model="S4224", ports=48, ten_giga_ports=4,
+                          vlans=1000, trunk_ranges=50, seed=0, **scale):
+    """Salida de "show running-config" con interfaces access/trunk/hybrid."""
+    rnd = random.Random(seed)
+    vlan_ids = list(range(2, vlans + 2))
+
+    lines = [
+        "Building configuration...",
+        "hostname SW-SCO123-ACC01",
+        "!",
+        "username admin privilege 15 password encrypted xxx",
+        "!",
+        "vlan 1",
+        "!",
+    ]
+    for vlan_id in vlan_ids:
+        lines.extend([f"vlan {vlan_id}", f" name Cliente-{vlan_id}", "!"])
+    if model == "LIB4424":
+        # El LIB4424 agrupa las VLAN sin nombre en rangos.
+        lines.extend([
+            f"vlan {vlans + 2}-{vlans + 200},{vlans + 300}", "!",
+            f"vlan {vlans + 400}-{vlans + 450}", "!",
+        ])
+    lines.extend([
+        "spanning-tree mode rstp",
+        "!",
+        "interface vlan 1",
+        " ip address 10.0.0.1 255.255.255.0",
+        "!",
+    ])
+
+    for number, interface in enumerate(interface_names(ports, ten_giga_ports)):
+        lines.append(f"interface {interface}")
+        if interface.startswith("10Giga"):
+            lines.extend([
+                " description FC-UPLINK-PORT",
+                " switchport trunk native vlan 1",
+                " switchport trunk allowed vlan " +
+                range_heavy_vlans(vlan_ids, trunk_ranges, rnd),
+                " switchport mode trunk",
+            ])
+        elif number % 4 == 0:
+            lines.extend([
+                f" description CLIENTE-{number}",
+                f" switchport access vlan {rnd.choice(vlan_ids)}",
+                " qos storm broadcast 10 mbps",
+                " qos storm unknown 10 mbps",
+            ])
+        elif number % 4 == 1:
+            lines.extend([
+                " shutdown",
+                " description LIBRE",
+                " switchport trunk native vlan 4000",
+                " switchport trunk allowed vlan 4000",
+                " switchport mode trunk",
+                " no spanning-tree",
+                " loop-protect",
+            ])
+        elif number % 4 == 2:
+            native_vlan = rnd.choice(vlan_ids)
+            lines.extend([
+                f" description CLIENTE-{number}",
+                " speed 100",
+                " duplex full",
+                " switchport hybrid allowed vlan " +
+                range_heavy_vlans(vlan_ids, trunk_ranges, rnd),
+                f" switchport hybrid native vlan {native_vlan}",
+                " switchport mode hybrid",
+            ])
+        else:
+            lines.append(f" description CLIENTE-{number}")
+            if model == "LIB4424":
+                lines.append(f" aggregation group {number % 8 + 1} mode active")
+            else:
+                lines.extend([" lacp", f" lacp key {number % 8 + 1}"])
+        lines.append("!")
+
+    lines.append("end")
+    return "\n".join(lines)
+
+
+def mac_table_output(ports=48, ten_giga_ports=4, vlans=1000, macs=100000,
+                     seed=0, **scale):
+    """Salida de "show mac address-table" con macs entradas."""
+    rnd = random.Random(seed)
+    interfaces = interface_names(ports, ten_giga_ports)
+
+    lines = ["Type       VID  MAC Address        Ports"]
+    for number in range(macs):
+        mac = "%012x" % (0x001122000000 + number)
+        mac = ":".join([mac[i:i + 2] for i in range(0, 12, 2)])
+        mac_type = "Static" if number % 50 == 0 else "Dynamic"
+        if number % 100 == 0:
+            # Entradas estaticas sobre varios puertos.
+            port = f"GigabitEthernet 1/{rnd.randint(1, ports - 1)},{ports}"
+        else:
+            port = rnd.choice(interfaces)
+        vlan_id = rnd.randint(1, min(vlans + 1, 4094))
+        lines.append(f"{mac_type:<10} {vlan_id:<4} {mac}  {port}")
+    return "\n".join(lines)
+
+
+def interface_status_output(ports=48, ten_giga_ports=4, **scale):
+    """Salida de "show interface * status"."""
+    lines = [
+        "Interface                Mode    Speed & Duplex  Flow Control  "
+        "Max Frame  Excessive  Link     Media",
+        "------------------------ ------- --------------- ------------- "
+        "---------- ---------- -------- ------",
+    ]
+    for number, interface in enumerate(interface_names(ports, ten_giga_ports)):
+        link, media = ("1Gfdx", "RJ45") if number % 3 else ("Down", "")
+        lines.append(
+            f"{interface:<24} enabled {'Auto':<15} {'disabled':<13} "
+            f"{'9600':<10} {'Discard':<10} {link:<8} {media}")
+    return "\n".join(lines)
+
+
+def transceiver_output(ports=48, ten_giga_ports=4, **scale):
+    """Salida de "show interface * transceiver" (SFP en los uplinks)."""
+    lines = []
+    sfp_interfaces = (
+        [f"GigabitEthernet 1/{port}"
+         for port in range(max(ports - 3, 1), ports + 1)] +
+        [f"10GigabitEthernet 1/{port}"
+         for port in range(1, ten_giga_ports + 1)]
+    )
+    for number, interface in enumerate(sfp_interfaces):
+        lines.extend([
+            interface,
+            "-" * len(interface),
+            "Transceiver Information:",
+            "Vendor          : FINISAR CORP.",
+            "Part Number     : FTLX1471D3BCL",
+            f"Serial Number   : XYZ{number:06d}",
+            "Revision        : A",
+            "Transceiver     : 10GBASE_LR",
+            "DDMI Information:",
+            "Temperature     : 30.1",
+        ])
+    return "\n".join(lines)
+
+
+def version_output(model="S4224", **scale):
+    """Salida de "show version"."""
+    return "\n".join([
+        "MAC Address      : 00-c0-f2-11-22-33",
+        "Previous Restart : Cold",
+        "System Name      : SW-SCO123-ACC01",
+        "System Location  : Buenos Aires",
+        "System Uptime    : 12d 03:04:05",
+        f"Software Version : TN-{model}-v7.10.0015",
+        "Serial #         : A0123456789",
+    ])
+
+
+def loop_protect_output(ports=48, ten_giga_ports=4, **scale):
+    """Salida de "show loop-protect"."""
+    lines = [
+        "Loop Protection Configuration",
+        "======================================",
+        "Loop Protection    : Enable",
+        "Transmission Time  : 5 sec",
+        "Shutdown Time      : 180 sec",
+        "",
+    ]
+    for number, interface in enumerate(interface_names(ports, ten_giga_ports)):
+        lines.extend([interface, "-" * len(interface)])
+        if number % 10 == 0:
+            lines.extend([
+                "    Loop protect mode is enabled.",
+                "    Actions are both of shutdown and log.",
+                "    Transmit mode is enabled.",
+                "    Loop is detected.",
+                "    The number of loops is 3.",
+                "    Time of last loop is at 2024-01-01T10:00:00+00:00",
+                "    Status is down.",
+            ])
+        else:
+            lines.extend([
+                "    Loop protect mode is enabled.",
+                "    Action is shutdown.",
+                "    Transmit mode is enabled.",
+                "    No loop.",
+                "    The number of loops is 0.",
+                "    Status is up.",
+            ])
+        lines.append("")
+    return "\n".join(lines)
+
+
+def synthetic_outputs(model="S4224", **scale):
+    """Salidas de todos los comandos de _get_commands, indexadas por
+    "information", con el mismo formato que recibe _serializer.
+    """
+    scale = dict(DEFAULT_SCALE, **scale)
+    return {
+        "cnfg_txt": running_config_output(model=model, **scale),
+        "mac_add_txt": mac_table_output(**scale),
+        "int_status_txt": interface_status_output(**scale),
+        "ddmi_status_txt": transceiver_output(**scale),
+        "system_status_txt": version_output(model=model, **scale),
+        "lp_status_txt": loop_protect_output(**scale)
+    }
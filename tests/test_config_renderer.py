@@ -0,0 +1,112 @@
+import unittest
+from config_renderer import FREE_PORT_TEMPLATES
+from config_renderer import free_port_template
+from config_renderer import interface_ranges
+from config_renderer import render_interface_config
+
+
+def expand_range(interface_range):
+    """Interfaces que abarca "GigabitEthernet 1/3,5-7" en el equipo."""
+    prefix, ports = interface_range.rsplit("/", 1)
+    interface_names = []
+    for port_range in ports.split(","):
+        start, _, end = port_range.partition("-")
+        for port in range(int(start), int(end or start) + 1):
+            interface_names.append(f"{prefix}/{port}")
+    return interface_names
+
+
+class InterfaceRangesTest(unittest.TestCase):
+
+    def test_single_port(self):
+        self.assertEqual(
+            interface_ranges(["GigabitEthernet 1/5"]),
+            ["GigabitEthernet 1/5"])
+
+    def test_consecutive_ports_and_gaps(self):
+        self.assertEqual(
+            interface_ranges([
+                "GigabitEthernet 1/3", "GigabitEthernet 1/5",
+                "GigabitEthernet 1/6", "GigabitEthernet 1/7",
+                "GigabitEthernet 1/10", "GigabitEthernet 1/12",
+                "GigabitEthernet 1/13"]),
+            ["GigabitEthernet 1/3,5-7,10,12-13"])
+
+    def test_unordered_and_repeated_ports(self):
+        self.assertEqual(
+            interface_ranges([
+                "GigabitEthernet 1/7", "GigabitEthernet 1/5",
+                "GigabitEthernet 1/6", "GigabitEthernet 1/5"]),
+            ["GigabitEthernet 1/5-7"])
+
+    def test_mixed_interface_types(self):
+        # 1/1 de GigabitEthernet y de 10GigabitEthernet son puertos
+        # distintos: nunca se agrupan en el mismo rango.
+        self.assertEqual(
+            interface_ranges([
+                "GigabitEthernet 1/1", "10GigabitEthernet 1/1",
+                "GigabitEthernet 1/2", "10GigabitEthernet 1/2",
+                "10GigabitEthernet 1/4"]),
+            ["GigabitEthernet 1/1-2", "10GigabitEthernet 1/1-2,4"])
+
+    def test_different_slots(self):
+        self.assertEqual(
+            interface_ranges(["GigabitEthernet 1/1", "GigabitEthernet 2/2"]),
+            ["GigabitEthernet 1/1", "GigabitEthernet 2/2"])
+
+    def test_unparseable_name_in_own_block(self):
+        self.assertEqual(
+            interface_ranges(["GigabitEthernet 1/1", "vlan 10",
+                              "GigabitEthernet 1/2"]),
+            ["GigabitEthernet 1/1-2", "vlan 10"])
+
+    def test_ranges_cover_exactly_the_requested_ports(self):
+        interface_names = [
+            f"GigabitEthernet 1/{port}"
+            for port in (1, 2, 4, 8, 9, 10, 11, 15, 20, 22, 23, 24)
+        ] + ["10GigabitEthernet 1/1", "10GigabitEthernet 1/3"]
+        expanded = []
+        for interface_range in interface_ranges(interface_names):
+            expanded.extend(expand_range(interface_range))
+        self.assertEqual(sorted(expanded), sorted(interface_names))
+
+
+class RenderInterfaceConfigTest(unittest.TestCase):
+
+    def test_one_block_per_template_and_range(self):
+        template = free_port_template("1")
+        other_template = ("shutdown", "description RESERVADO")
+        config = render_interface_config([
+            ("GigabitEthernet 1/3", template),
+            ("GigabitEthernet 1/5", template),
+            ("GigabitEthernet 1/4", other_template),
+            ("GigabitEthernet 1/6", template),
+            ("10GigabitEthernet 1/1", template),
+        ])
+
+        self.assertEqual(config, (
+            ["interface GigabitEthernet 1/3,5-6"] + list(template) +
+            ["exit", "interface 10GigabitEthernet 1/1"] + list(template) +
+            ["exit", "interface GigabitEthernet 1/4"] +
+            list(other_template) + ["exit"]))
+
+    def test_same_lines_as_list_are_one_template(self):
+        template = free_port_template("6")
+        config = render_interface_config([
+            ("GigabitEthernet 1/1", template),
+            ("GigabitEthernet 1/2", list(template)),
+        ])
+        self.assertEqual(
+            config,
+            ["interface GigabitEthernet 1/1-2"] + list(template) + ["exit"])
+
+    def test_empty(self):
+        self.assertEqual(render_interface_config([]), [])
+
+    def test_template_per_model(self):
+        self.assertIs(free_port_template("1"), FREE_PORT_TEMPLATES["S4224"])
+        self.assertIs(free_port_template("6"), FREE_PORT_TEMPLATES["LIB4424"])
+
+
+if __name__ == "__main__":
+    unittest.main()
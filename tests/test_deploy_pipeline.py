@@ -0,0 +1,56 @@
+import threading
+import unittest
+from deploy_pipeline import DevicePipeline
+
+
+class DevicePipelineTest(unittest.TestCase):
+
+    def run_pipeline(self, deploy, items=range(6), **kwargs):
+        pipeline = DevicePipeline(
+            collect_workers=2, deploy_workers=3, soak_time=0, **kwargs)
+        outcome = {}
+
+        def run():
+            outcome['results'], outcome['not_deployed'] = pipeline.run(
+                items, lambda item: item, lambda item, data: item, deploy)
+
+        # Si un worker queda esperando al canary, run() no termina nunca.
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(10)
+        self.assertFalse(thread.is_alive(), "el pipeline quedo bloqueado")
+        return outcome['results'], outcome['not_deployed']
+
+    def test_all_deployed(self):
+        results, not_deployed = self.run_pipeline(
+            lambda item: (True, [item]))
+
+        self.assertEqual(sorted(sum(results, [])), list(range(6)))
+        self.assertEqual(not_deployed, [])
+
+    def test_canary_exception_stops_rollout(self):
+        deployed = []
+
+        def deploy(item):
+            if not deployed:
+                deployed.append(item)
+                raise ConnectionError("sesion cerrada")
+            deployed.append(item)
+            return True, [item]
+
+        results, not_deployed = self.run_pipeline(deploy)
+
+        self.assertEqual(len(deployed), 1)
+        self.assertEqual(results, [[]])
+        self.assertEqual(len(not_deployed), 5)
+
+    def test_canary_failure_stops_rollout(self):
+        results, not_deployed = self.run_pipeline(
+            lambda item: (False, [item]))
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(len(not_deployed), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import threading
+import unittest
+from unittest import mock
+from deploy_scheduler import WaveScheduler
+
+
+class FakeDeploy():
+    """deploy(item) que falla para los items indicados y registra el orden."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.deployed = []
+        self._lock = threading.Lock()
+
+    def __call__(self, item):
+        with self._lock:
+            self.deployed.append(item)
+        return item not in self.failing, item
+
+
+class WaveSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        sleep = mock.patch("deploy_scheduler.time.sleep")
+        self.sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def test_waves_start_with_canary(self):
+        scheduler = WaveScheduler(canary_size=1, wave_size=4)
+        self.assertEqual(
+            scheduler._waves(list(range(10))),
+            [[0], [1, 2, 3, 4], [5, 6, 7, 8], [9]])
+        self.assertEqual(
+            WaveScheduler(canary_size=0, wave_size=4)._waves(list(range(5))),
+            [[0, 1, 2, 3], [4]])
+
+    def test_all_deployed_in_order(self):
+        deploy = FakeDeploy()
+        results, pending = WaveScheduler(wave_size=3, soak_time=5).run(
+            range(8), deploy)
+
+        self.assertEqual(results, list(range(8)))
+        self.assertEqual(pending, [])
+
+    def test_canary_failure_stops_every_later_wave(self):
+        deploy = FakeDeploy(failing=[0])
+        results, pending = WaveScheduler(wave_size=3, soak_time=5).run(
+            range(8), deploy)
+
+        self.assertEqual(deploy.deployed, [0])
+        self.assertEqual(results, [0])
+        self.assertEqual(pending, list(range(1, 8)))
+        self.sleep.assert_not_called()
+
+    def test_failure_rate_above_threshold_returns_pending(self):
+        # Ola 2 = [1, 2, 3, 4]: 2 fallas de 4 (50%) superan el 25%.
+        deploy = FakeDeploy(failing=[2, 3])
+        results, pending = WaveScheduler(
+            wave_size=4, soak_time=5, max_failure_rate=0.25).run(
+                range(10), deploy)
+
+        self.assertEqual(sorted(deploy.deployed), [0, 1, 2, 3, 4])
+        self.assertEqual(results, [0, 1, 2, 3, 4])
+        self.assertEqual(pending, [5, 6, 7, 8, 9])
+
+    def test_failure_rate_at_threshold_continues(self):
+        # 1 falla de 4 (25%) no supera el maximo.
+        deploy = FakeDeploy(failing=[2])
+        results, pending = WaveScheduler(
+            wave_size=4, soak_time=5, max_failure_rate=0.25).run(
+                range(9), deploy)
+
+        self.assertEqual(results, list(range(9)))
+        self.assertEqual(pending, [])
+
+    def test_soak_only_between_waves(self):
+        WaveScheduler(wave_size=4, soak_time=5).run(range(9), FakeDeploy())
+        # Tres olas ([0], [1-4], [5-8]): se espera dos veces, no al final.
+        self.assertEqual(self.sleep.call_args_list, [mock.call(5)] * 2)
+
+        self.sleep.reset_mock()
+        WaveScheduler(wave_size=4, soak_time=5).run(range(1), FakeDeploy())
+        self.sleep.assert_not_called()
+
+    def test_no_soak_after_halted_wave(self):
+        WaveScheduler(wave_size=4, soak_time=5).run(
+            range(9), FakeDeploy(failing=[1, 2, 3, 4]))
+        # Solo la espera luego del canary.
+        self.assertEqual(self.sleep.call_args_list, [mock.call(5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
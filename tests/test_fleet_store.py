@@ -0,0 +1,119 @@
+import os
+import json
+import tempfile
+import unittest
+from fleet_store import FleetStore
+from vlan_set import VlanSet
+
+
+def interface_config(full_name, port_mode, members, native, description):
+    return {
+        "full_name": full_name,
+        "switchport": {
+            "port-mode": port_mode,
+            "vlans": {"members": members, "native": native}
+        },
+        "description": description,
+        "admin_state": "enabled"
+    }
+
+
+def snapshot(mgmt_ip="10.0.0.1"):
+    return {
+        "mgmt_ip": mgmt_ip,
+        "device_model_id": "1",
+        "hostname": "SW-SCO123-ACC01",
+        "os_version": "TN-S4224-v7.10.0015",
+        "serialnumber": "A0123456789",
+        "system_status": {"system_location": "Buenos Aires"},
+        "serialized_configuration": {
+            "cnfg_json": {
+                "cnfg_interfaces": {
+                    "GigabitEthernet": [
+                        # Trunk sin "allowed vlan": el parser deja ["All"].
+                        interface_config(
+                            "GigabitEthernet 1/1", "trunk", ["All"], [1],
+                            ["CPE", "cliente", "X"]),
+                        interface_config(
+                            "GigabitEthernet 1/2", "trunk",
+                            VlanSet.from_string("4000"), 4000, ["LIBRE"]),
+                    ],
+                    "10GigabitEthernet": []
+                },
+                "cnfg_vlans": [{"vlan_id": 4000, "vlan_name": None}]
+            }
+        },
+        "interface_status": {
+            "interfaces": [
+                {
+                    "interface_type": "GigabitEthernet",
+                    "interface_full_name": "GigabitEthernet 1/1",
+                    "admin_mode": "enabled",
+                    "speed_duplex": "Auto",
+                    "link_state": "1Gfdx",
+                    "link_medium": "RJ45"
+                },
+                {
+                    "interface_type": "GigabitEthernet",
+                    "interface_full_name": "GigabitEthernet 1/2",
+                    "admin_mode": "enabled",
+                    "speed_duplex": "Auto",
+                    "link_state": "Down",
+                    "link_medium": None
+                }
+            ]
+        }
+    }
+
+
+class FleetStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = FleetStore(os.path.join(self.tmp_dir.name, "fleet.db"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def test_trunk_without_allowed_vlan_carries_all_vlans(self):
+        self.store.add(snapshot())
+
+        port = self.store.query(
+            "SELECT vlan_members FROM interfaces"
+            " WHERE interface_full_name = 'GigabitEthernet 1/1'")[0]
+        self.assertEqual(port['vlan_members'], "1-4094")
+        self.assertEqual(
+            [row['interface_full_name']
+             for row in self.store.ports_with_vlan(100)],
+            ["GigabitEthernet 1/1"])
+
+    def test_all_vlans_from_json_backup(self):
+        # Mismo snapshot leido de un backup JSON (--ingest).
+        file_path = os.path.join(self.tmp_dir.name, "backup.json")
+        with open(file_path, "w") as outfile:
+            json.dump(snapshot(), outfile, default=str)
+
+        self.assertEqual(self.store.ingest_files([file_path]), 1)
+        self.assertEqual(len(self.store.ports_with_vlan(4000)), 2)
+
+    def test_description_keeps_words(self):
+        self.store.add(snapshot())
+
+        port = self.store.query(
+            "SELECT description FROM interfaces"
+            " WHERE interface_full_name = 'GigabitEthernet 1/1'")[0]
+        self.assertEqual(port['description'], "CPE cliente X")
+
+    def test_down_ports_by_description(self):
+        self.store.add(snapshot("10.0.0.1"))
+        self.store.add(snapshot("10.0.0.2"))
+
+        ports = self.store.ports_by_state("Down", "LIBRE")
+        self.assertEqual(
+            sorted([port['mgmt_ip'] for port in ports]),
+            ["10.0.0.1", "10.0.0.2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import re
+import unittest
+from device_models import DEVICE_MODEL
+from synthetic_outputs import loop_protect_output
+from transition_device import S4224
+
+
+def legacy_loop_protect_status(lp_status_txt):
+    """_get_loop_protect_status anterior al parser de una sola pasada.
+
+    Se mantiene sin cambios como referencia: el parser actual tiene que
+    devolver exactamente lo mismo para cualquier salida.
+    """
+
+    lp_interface_status = []
+    lp_intfc_info = {}
+    interface_line = False
+    lp_status = {
+        'lp_global_status': {},
+        'lp_interface_status': lp_interface_status
+    }
+
+    for line in lp_status_txt:
+        try:
+            # Global Loop-Protect Status
+            lp_global_status = re.search(r'Loop Protection\s*:(.+)', line)
+            if lp_global_status is not None:
+                lp_status["lp_global_status"]['loop_protection'] = (
+                    lp_global_status.group(1)).lstrip()
+
+            lp_tx_time = re.search(r'Transmission Time\s*:(.+)', line)
+            if lp_tx_time is not None:
+                lp_status["lp_global_status"]['transmission_time'] = (
+                    lp_tx_time.group(1)).lstrip()
+
+            shutdown_time = re.search(r'Shutdown Time\s*:(.+)', line)
+            if shutdown_time is not None:
+                lp_status["lp_global_status"]['shutdown_time'] = (
+                    shutdown_time.group(1)).lstrip()
+
+            # Interface Loop-Protect Status
+            interface = re.search(r'([0-1a-zA-Z]+)\s+(1/.+)', line)
+            if interface is not None:
+                lp_intfc_info["interface"] = interface.group(0)
+                interface_line = True
+
+            if interface_line:
+                loop_protect_mode = re.search(
+                    r'Loop protect mode is\s(.+)?.', line)
+                if loop_protect_mode is not None:
+                    lp_intfc_info["loop_protect_mode"] = \
+                        loop_protect_mode.group(1).lstrip()
+
+                action = re.search(r'Action is\s*(.+)?.', line)
+                if action is not None:
+                    lp_intfc_info["action"] = action.group(1)
+
+                action = re.search(r'Actions are both of\s*(.+)?.', line)
+                if action is not None:
+                    lp_intfc_info["action"] = action.group(1)
+
+                transmit_mode = re.search(
+                    r'Transmit mode is\s*(.+)?.', line)
+                if transmit_mode is not None:
+                    lp_intfc_info["transmit_mode"] = \
+                        transmit_mode.group(1)
+
+                loop_status = re.search(r'No loop.', line)
+                if loop_status is not None:
+                    lp_intfc_info["loop_status"] = "No loop"
+
+                loop_status = re.search(r'Loop is detected.', line)
+                if loop_status is not None:
+                    lp_intfc_info["loop_status"] = "Loop is detected"
+
+                number_of_loops = re.search(
+                    r'The number of loops is\s*(.+)?.', line)
+                if number_of_loops is not None:
+                    lp_intfc_info["number_of_loops"] = \
+                        number_of_loops.group(1)
+
+                time_of_last_loop = re.search(
+                    r'Time of last loop is at\s*(.+)', line)
+                if time_of_last_loop is not None:
+                    lp_intfc_info["time_of_last_loop"] = \
+                        time_of_last_loop.group(1)
+
+                status = re.search(
+                    r'Status is\s*(.+)?.', line)
+                if status is not None:
+                    lp_intfc_info["status"] = status.group(1)
+
+                # Check if it is the last line or if it
+                # finished reading the interface DDMI
+                if ("" == line and interface_line or
+                        lp_status_txt[-1] == line and interface_line):
+                    interface_line = False
+                    lp_interface_status.append(lp_intfc_info)
+                    lp_intfc_info = {}
+
+        except AttributeError:
+            continue
+
+    return lp_status
+
+
+class LoopProtectParityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.device = S4224(
+            device_model_id="1",
+            mgmt_ip="0.0.0.0",
+            device_model=DEVICE_MODEL["1"],
+            credentials={}
+        )
+        self.output = loop_protect_output(ports=24, ten_giga_ports=4)
+
+    def assertParity(self, output):
+        lp_status_txt = output.split('\n')
+        expected = legacy_loop_protect_status(lp_status_txt)
+        self.assertEqual(
+            self.device._get_loop_protect_status(lp_status_txt), expected)
+        # Tambien como iterador de lineas, como lo recibe en modo streaming.
+        self.assertEqual(
+            self.device._get_loop_protect_status(iter(lp_status_txt)),
+            expected)
+        return expected
+
+    def test_full_output(self):
+        lp_status = self.assertParity(self.output)
+        self.assertEqual(len(lp_status['lp_interface_status']), 28)
+
+    def test_no_trailing_blank_line(self):
+        lp_status = self.assertParity(self.output.rstrip('\n'))
+        self.assertEqual(len(lp_status['lp_interface_status']), 28)
+
+    def test_indented_blank_line(self):
+        self.assertParity(self.output.replace(
+            "    Status is up.\n", "    Status is up.\n    \n"))
+
+    def test_crlf_line_endings(self):
+        self.assertParity(self.output.replace('\n', '\r\n'))
+
+    def test_truncated_output(self):
+        lines = self.output.split('\n')
+        for cut in range(1, len(lines)):
+            truncated = lines[:cut]
+            with self.subTest(cut=cut, last_line=truncated[-1]):
+                if truncated.count(truncated[-1]) == 1:
+                    self.assertParity('\n'.join(truncated))
+                # Si la ultima linea se repite antes ("Status is up."), el
+                # parser anterior cerraba cada bloque en esa linea y pasaba
+                # el resto de los campos a la interfaz siguiente. El parser
+                # actual cierra el ultimo bloque al final, igual que el
+                # anterior con la linea vacia que el equipo no llego a enviar.
+                self.assertEqual(
+                    self.device._get_loop_protect_status(truncated),
+                    legacy_loop_protect_status(truncated + [""]))
+
+    def test_prompt_at_end(self):
+        self.assertParity(self.output + "SW-SCO123-ACC01#")
+        self.assertParity(
+            self.output.rstrip('\n') + "\nSW-SCO123-ACC01#")
+
+
+if __name__ == "__main__":
+    unittest.main()
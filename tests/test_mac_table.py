@@ -0,0 +1,73 @@
+import unittest
+from mac_table import MacTable
+
+ENTRIES = [
+    ("Dynamic", "10", "00:11:22:33:44:55", "GigabitEthernet 1/1"),
+    ("Dynamic", "10", "00:11:22:33:44:56", "GigabitEthernet 1/1"),
+    ("Static", "20", "aa:bb:cc:dd:ee:ff", "GigabitEthernet 1/2"),
+    ("Dynamic", "4000", "00:00:00:00:00:01", "10GigabitEthernet 1/1"),
+    ("Dynamic", "20", "00:11:22:33:44:55", "GigabitEthernet 1/2"),
+]
+
+
+def entry_dict(mac_type, vlan_id, mac, interface):
+    return dict(mac_type=mac_type, vlan_id=vlan_id, mac=mac,
+                interface=interface)
+
+
+class MacTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.mac_table = MacTable()
+        for entry in ENTRIES:
+            self.mac_table.append(*entry)
+        self.rows = [entry_dict(*entry) for entry in ENTRIES]
+
+    def test_rows_keep_legacy_format(self):
+        self.assertEqual(list(self.mac_table), self.rows)
+        self.assertEqual(self.mac_table.to_json(), self.rows)
+        self.assertEqual(len(self.mac_table), len(ENTRIES))
+
+    def test_pack_mac_round_trip(self):
+        for mac in ("00:00:00:00:00:00", "aa:bb:cc:dd:ee:ff",
+                    "00:11:22:33:44:55"):
+            self.assertEqual(
+                MacTable.unpack_mac(MacTable.pack_mac(mac)), mac)
+
+    def test_getitem_index_and_slice(self):
+        self.assertEqual(self.mac_table[0], self.rows[0])
+        self.assertEqual(self.mac_table[-1], self.rows[-1])
+        self.assertEqual(self.mac_table[1:3], self.rows[1:3])
+        self.assertEqual(self.mac_table[::-2], self.rows[::-2])
+        self.assertEqual(self.mac_table[10:], [])
+        with self.assertRaises(IndexError):
+            self.mac_table[len(ENTRIES)]
+
+    def test_port_index(self):
+        self.assertEqual(
+            self.mac_table.ports(),
+            ["GigabitEthernet 1/1", "GigabitEthernet 1/2",
+             "10GigabitEthernet 1/1"])
+        self.assertEqual(
+            self.mac_table.rows_for_port("GigabitEthernet 1/2"),
+            [self.rows[2], self.rows[4]])
+        self.assertEqual(
+            self.mac_table.macs_on_port("GigabitEthernet 1/1"),
+            ["00:11:22:33:44:55", "00:11:22:33:44:56"])
+        self.assertEqual(
+            self.mac_table.rows_for_port("GigabitEthernet 1/9"), [])
+        self.assertEqual(
+            self.mac_table.macs_on_port("GigabitEthernet 1/9"), [])
+
+    def test_vlan_index(self):
+        self.assertEqual(self.mac_table.vlans(), [10, 20, 4000])
+        # La VLAN se acepta como entero o como texto.
+        self.assertEqual(
+            self.mac_table.rows_for_vlan(20), [self.rows[2], self.rows[4]])
+        self.assertEqual(
+            self.mac_table.rows_for_vlan("10"), self.rows[:2])
+        self.assertEqual(self.mac_table.rows_for_vlan(30), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
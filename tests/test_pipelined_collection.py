@@ -0,0 +1,129 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from device_models import DEVICE_MODEL
+from replay_connection import ReplayConnection
+from replay_connection import record_outputs
+from synthetic_outputs import synthetic_outputs
+from timing_calibration import TimingCalibration
+from transition_device import S4224
+
+MGMT_IP = "10.0.0.1"
+
+
+class StalledReplayConnection(ReplayConnection):
+    """Replay cuyo envio se corta a mitad de la salida de cut_inside.
+
+    Simula un equipo que deja de responder en medio de la tabla de MAC:
+    read_channel entrega el principio y luego nada, hasta el timeout. El
+    resto de la salida llega tarde, con el siguiente envio, salvo que se
+    descarte con clear_buffer. Con fail_resend el corte se repite en cada
+    reintento.
+    """
+
+    def __init__(self, *args, cut_inside=None, fail_resend=False,
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cut_inside = cut_inside
+        self.fail_resend = fail_resend
+        self._stalled = False
+        self._late = ""
+
+    def write_channel(self, data):
+        self._channel += self._late
+        self._late = ""
+        super().write_channel(data)
+        if not self.cut_inside or (self._stalled and not self.fail_resend):
+            return
+        show_content = self._read_output(self.cut_inside)
+        if show_content not in self._channel:
+            return
+        self._stalled = True
+        cut = self._channel.index(show_content) + len(show_content) // 2
+        self._channel, self._late = \
+            self._channel[:cut], self._channel[cut:]
+
+    def clear_buffer(self):
+        super().clear_buffer()
+        self._late = ""
+
+    def send_command(self, command, **kwargs):
+        if self.fail_resend and command == self.cut_inside:
+            return ""
+        return super().send_command(command, **kwargs)
+
+
+class PipelinedCollectionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.outputs = synthetic_outputs(
+            "S4224", ports=8, vlans=20, trunk_ranges=4, macs=200)
+        record_outputs(self.tmp_dir.name, MGMT_IP, self.outputs)
+
+        self.device = S4224(
+            device_model_id="1",
+            mgmt_ip=MGMT_IP,
+            device_model=DEVICE_MODEL["1"],
+            credentials={},
+            exec_mode="pipelined",
+            replay_dir=self.tmp_dir.name,
+            collection_profile="full-backup"
+        )
+        # El read_timeout sale del RTT del find_prompt: con replay es casi
+        # nulo y el corte se detecta en el minimo calibrado.
+        min_read_timeout = mock.patch.object(
+            TimingCalibration, "MIN_READ_TIMEOUT", 0.2)
+        min_read_timeout.start()
+        self.addCleanup(min_read_timeout.stop)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def connection(self, **kwargs):
+        return StalledReplayConnection(
+            self.tmp_dir.name, MGMT_IP,
+            {command['command']: command['information']
+             for command in self.device._get_commands()},
+            **kwargs)
+
+    def test_split_marks_unterminated_blocks(self):
+        self.device._prompt = "SW#"
+        show_contents = self.device._split_pipelined_output(
+            "show a\n1\n2\n3\n4\nSW#show b\n1\n2\n3\n4\n5\n6",
+            ["show a", "show b", "show c"])
+
+        self.assertEqual(show_contents[0], "1\n2\n3\n4")
+        # "show b" no llego al prompt y "show c" nunca llego.
+        self.assertEqual(show_contents[1:], [None, None])
+
+    def test_truncated_block_is_resent(self):
+        sw_txt_information = self.device._collect_pipelined(
+            self.connection(cut_inside="show mac address-table"))
+
+        # La salida cortada se descarta y se vuelve a pedir completa; las
+        # anteriores al corte se toman del envio combinado.
+        self.assertEqual(sw_txt_information, self.outputs)
+
+    def test_truncated_block_is_never_saved(self):
+        sw_txt_information = self.device._collect_pipelined(
+            self.connection(
+                cut_inside="show mac address-table", fail_resend=True))
+
+        self.assertNotIn('mac_add_txt', sw_txt_information)
+        self.assertEqual(
+            sw_txt_information['cnfg_txt'], self.outputs['cnfg_txt'])
+
+    def test_pipelined_records_rtt_sample(self):
+        file_path = os.path.join(self.tmp_dir.name, "calibration.json")
+        self.device.timing_calibration = TimingCalibration(file_path)
+        self.device._collect_pipelined(self.connection())
+
+        self.assertEqual(
+            self.device.timing_calibration.get_read_timeout(MGMT_IP),
+            self.device._read_timeout)
+
+
+if __name__ == "__main__":
+    unittest.main()
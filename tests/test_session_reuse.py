@@ -0,0 +1,63 @@
+import unittest
+from device_models import DEVICE_MODEL
+from session_manager import SessionManager
+from transition_device import S4224
+
+MGMT_IP = "10.0.0.1"
+
+
+class CollectedSession():
+    """Sesion abierta durante la toma de informacion."""
+
+    def __init__(self):
+        self.global_delay_factor = 5
+        self.config_delay_factor = None
+
+    def find_prompt(self):
+        return "SW#"
+
+    def send_config_set(self, config_commands, **kwargs):
+        self.config_delay_factor = self.global_delay_factor
+        return "\n".join(config_commands)
+
+    def is_alive(self):
+        return True
+
+    def disconnect(self):
+        pass
+
+
+class SessionReuseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.session_manager = SessionManager()
+        self.session = CollectedSession()
+        with self.session_manager.session(MGMT_IP, lambda: self.session):
+            pass
+
+    def tearDown(self):
+        self.session_manager.close_all()
+
+    def device(self, exec_mode):
+        return S4224(
+            device_model_id="1",
+            mgmt_ip=MGMT_IP,
+            device_model=DEVICE_MODEL["1"],
+            credentials={'username': "admin", 'password': "admin"},
+            session_manager=self.session_manager,
+            exec_mode=exec_mode
+        )
+
+    def test_deploy_uses_its_own_delay_factor(self):
+        self.assertTrue(
+            self.device("delay").deploy_configuration(["interface x"]))
+        self.assertEqual(self.session.config_delay_factor, 2)
+
+    def test_deploy_keeps_fast_cli_timing(self):
+        self.device("prompt").deploy_configuration(["interface x"])
+        self.assertEqual(self.session.config_delay_factor, 1)
+        self.assertTrue(self.session.fast_cli)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import json
+import tempfile
+import unittest
+from unittest import mock
+from device_models import DEVICE_MODEL
+from replay_connection import record_outputs
+from serialization import json_default
+from synthetic_outputs import synthetic_outputs
+from timing_calibration import TimingCalibration
+from transition_device import S4224
+from tests.test_pipelined_collection import MGMT_IP
+from tests.test_pipelined_collection import StalledReplayConnection
+
+
+def serialized(parsed_section):
+    # MacTable y VlanSet se comparan por lo que se guarda en el backup.
+    return json.loads(json.dumps(parsed_section, default=json_default))
+
+
+class StreamingCollectionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.outputs = synthetic_outputs(
+            "S4224", ports=8, vlans=20, trunk_ranges=4, macs=300)
+        record_outputs(self.tmp_dir.name, MGMT_IP, self.outputs)
+
+        self.device = S4224(
+            device_model_id="1",
+            mgmt_ip=MGMT_IP,
+            device_model=DEVICE_MODEL["1"],
+            credentials={},
+            exec_mode="streaming",
+            replay_dir=self.tmp_dir.name,
+            collection_profile="full-backup"
+        )
+        min_read_timeout = mock.patch.object(
+            TimingCalibration, "MIN_READ_TIMEOUT", 0.2)
+        min_read_timeout.start()
+        self.addCleanup(min_read_timeout.stop)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def connection(self, **kwargs):
+        return StalledReplayConnection(
+            self.tmp_dir.name, MGMT_IP,
+            {command['command']: command['information']
+             for command in self.device._get_commands()},
+            **kwargs)
+
+    def expected_section(self, information):
+        return serialized(self.device._parse_section(
+            information, self.outputs[information]))
+
+    def test_stalled_command_is_retried(self):
+        parsed_sections = self.device._collect_streaming(
+            self.connection(cut_inside="show mac address-table"))
+
+        # La tabla cortada no se guarda; el reintento trae la completa y
+        # el resto de la salida cortada no pasa al comando siguiente.
+        for information in self.outputs:
+            self.assertEqual(
+                serialized(parsed_sections[information]),
+                self.expected_section(information), information)
+
+    def test_stalled_command_is_never_saved(self):
+        parsed_sections = self.device._collect_streaming(
+            self.connection(
+                cut_inside="show mac address-table", fail_resend=True))
+
+        self.assertNotIn('mac_add_txt', parsed_sections)
+        self.assertEqual(
+            serialized(parsed_sections['int_status_txt']),
+            self.expected_section('int_status_txt'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import time
+import tempfile
+import unittest
+from device_models import DEVICE_MODEL
+from timing_calibration import TimingCalibration
+from transition_device import S4224
+
+
+class SlowOutputConnection():
+    """Equipo que responde el prompt al instante pero tarda en entregar
+    cada salida, como un running-config grande."""
+
+    def __init__(self, output_time):
+        self.output_time = output_time
+
+    def find_prompt(self):
+        return "SW#"
+
+    def send_command(self, command, **kwargs):
+        time.sleep(self.output_time)
+        return "line\n" * 10
+
+
+class PromptCalibrationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.timing_calibration = TimingCalibration(
+            os.path.join(self.tmp_dir.name, "calibration.json"))
+        self.device = S4224(
+            device_model_id="1",
+            mgmt_ip="10.0.0.1",
+            device_model=DEVICE_MODEL["1"],
+            credentials={},
+            exec_mode="prompt",
+            timing_calibration=self.timing_calibration
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_rtt_sample_is_find_prompt(self):
+        self.device._send_show_command(
+            SlowOutputConnection(0.3), "show running-config")
+
+        # El tiempo de la salida no cuenta como RTT.
+        self.assertEqual(
+            self.timing_calibration.get_read_timeout("10.0.0.1"),
+            TimingCalibration.MIN_READ_TIMEOUT)
+        self.assertLess(
+            self.timing_calibration._calibration["10.0.0.1"]["rtt"], 0.3)
+
+    def test_calibrated_once_per_session(self):
+        connection = SlowOutputConnection(0)
+        self.device._send_show_command(connection, "show running-config")
+        read_timeout = self.device._read_timeout
+        self.device._send_show_command(connection, "show version")
+
+        self.assertEqual(self.device._read_timeout, read_timeout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import json
+import unittest
+from serialization import json_default
+from vlan_set import VlanSet
+
+
+def legacy_vlan_list(vlans_txt):
+    """Expansion a lista de enteros de get_tagged_vlan antes de VlanSet."""
+    vlans = vlans_txt.split(",")
+    vlan_list = []
+    for i in range(len(vlans)):
+        if "-" in vlans[i]:
+            vlan_range = vlans[i].split('-')
+            vlan_range = (
+                list(
+                    range(
+                        int(vlan_range[0]),
+                        int(vlan_range[1])+1))
+            )
+            vlan_list.extend(vlan_range)
+        elif "none" in vlans[i]:
+            vlan_list = []
+        else:
+            vlan_list.append(int(vlans[i]))
+    return vlan_list
+
+
+VLANS_TXT = [
+    "none",
+    "10",
+    "4094",
+    "1-4094",
+    "10,20-30,40",
+    "40,10,20-30",
+    "10-20,15-25",
+    "10-20,21-30",
+    "10-20,12,15-16",
+    "5,5,5",
+    "100,none,200-202",
+]
+
+
+class VlanSetTest(unittest.TestCase):
+
+    def test_from_string_matches_legacy_expansion(self):
+        # VlanSet ordena y quita duplicados; el contenido es el mismo.
+        for vlans_txt in VLANS_TXT:
+            with self.subTest(vlans_txt=vlans_txt):
+                vlan_set = VlanSet.from_string(vlans_txt)
+                legacy = legacy_vlan_list(vlans_txt)
+                self.assertEqual(vlan_set.to_list(), sorted(set(legacy)))
+                self.assertEqual(len(vlan_set), len(set(legacy)))
+                for vlan_id in (1, 9, 10, 11, 20, 25, 30, 31, 4094):
+                    self.assertEqual(vlan_id in vlan_set, vlan_id in legacy)
+
+    def test_range_string_round_trip(self):
+        for vlans_txt in VLANS_TXT:
+            with self.subTest(vlans_txt=vlans_txt):
+                vlan_set = VlanSet.from_string(vlans_txt)
+                range_string = vlan_set.to_range_string()
+                if vlan_set:
+                    self.assertEqual(
+                        VlanSet.from_string(range_string), vlan_set)
+                self.assertEqual(
+                    legacy_vlan_list(range_string or "none"),
+                    vlan_set.to_list())
+
+    def test_range_string_is_compact(self):
+        self.assertEqual(VlanSet.from_string("none").to_range_string(), "")
+        self.assertEqual(
+            VlanSet.from_string("10-20,15-25").to_range_string(), "10-25")
+        self.assertEqual(
+            VlanSet.from_string("10-20,21-30,40").to_range_string(),
+            "10-30,40")
+        self.assertEqual(
+            VlanSet.from_vlans([3, 1, 2, 7]).to_range_string(), "1-3,7")
+        self.assertEqual(
+            json.dumps({"members": VlanSet.from_string("1,2,3")},
+                       default=json_default),
+            '{"members": "1-3"}')
+
+    def test_union_and_intersection_match_sets(self):
+        for first in VLANS_TXT:
+            for second in VLANS_TXT:
+                with self.subTest(first=first, second=second):
+                    first_set = VlanSet.from_string(first)
+                    second_set = VlanSet.from_string(second)
+                    first_legacy = set(legacy_vlan_list(first))
+                    second_legacy = set(legacy_vlan_list(second))
+                    self.assertEqual(
+                        (first_set | second_set).to_list(),
+                        sorted(first_legacy | second_legacy))
+                    self.assertEqual(
+                        (first_set & second_set).to_list(),
+                        sorted(first_legacy & second_legacy))
+
+    def test_empty_set(self):
+        vlan_set = VlanSet.from_string("none")
+        self.assertFalse(vlan_set)
+        self.assertEqual(vlan_set, VlanSet())
+        self.assertNotIn(1, vlan_set)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import json
+import time
+import threading
+
+
+class TimingCalibration():
+    """Timeouts de lectura calibrados por equipo a partir del RTT medido.
+
+    En los modos de ejecucion "prompt", "pipelined" y "streaming" los
+    comandos se leen hasta encontrar el prompt del equipo, por lo que el
+    read_timeout solo acota la espera en caso de falla. Se calcula como un
+    multiplo del tiempo del find_prompt y se persiste en un archivo JSON con
+    la ultima medicion de cada equipo.
+    """
+
+    RTT_FACTOR = 10
+    MIN_READ_TIMEOUT = 10
+    MAX_READ_TIMEOUT = 120
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        try:
+            with open(file_path, 'r') as file:
+                self._calibration = json.load(file)
+        except FileNotFoundError:
+            self._calibration = {}
+
+    @classmethod
+    def read_timeout_from_rtt(cls, rtt):
+        return round(min(max(rtt * cls.RTT_FACTOR, cls.MIN_READ_TIMEOUT),
+                         cls.MAX_READ_TIMEOUT), 1)
+
+    def get_read_timeout(self, mgmt_ip):
+        with self._lock:
+            calibration = self._calibration.get(mgmt_ip)
+        if calibration:
+            return calibration['read_timeout']
+
+    def record(self, mgmt_ip, rtt):
+        read_timeout = self.read_timeout_from_rtt(rtt)
+        with self._lock:
+            self._calibration[mgmt_ip] = {
+                "rtt": round(rtt, 3),
+                "read_timeout": read_timeout,
+                "updated_at": int(time.time())
+            }
+        return read_timeout
+
+    def save(self):
+        with self._lock:
+            with open(self.file_path, 'w') as file:
+                json.dump(self._calibration, file, indent=4)
@@ -1,16 +1,231 @@
 import re
+import time
 import logging
+from contextlib import contextmanager
 from logger import logger
 from netmiko import ConnectHandler
+from timing_calibration import TimingCalibration
+from vlan_set import VlanSet
+from mac_table import MacTable
+from device_snapshot import DeviceSnapshot
+from replay_connection import ReplayConnection
+from replay_connection import record_outputs
+
+
+INTERFACE_PATTERN = re.compile(r'([0-1a-zA-Z]+)\s+(1/.+)')
+
+INTERFACE_NAME_PATTERN = re.compile(r'([0-1a-zA-Z]+)\s+(1/\S+)$')
+
+# Columnas de "show interface * status", en el orden del encabezado.
+INTERFACE_STATUS_FIELDS = [
+    'interface', 'admin_mode', 'speed_duplex', 'flow_control', 'mtu',
+    'excessive', 'link_state', 'link_medium'
+]
+INTERFACE_STATUS_HEADER_COLUMN = re.compile(r'\S+(?: \S+)*')
+INTERFACE_STATUS_PATTERN = re.compile(
+    r'([0-1a-zA-Z]+)\s+(1/.+)\s+([a-z]+)\s+([0-1A-Za-z]+)\s+([a-z]+)\s+'
+    r'([0-9]+)\s+([A-Za-z]+)\s+([0-1A-Za-z]+)\s+(.+)')
+
+MAC_ENTRY_PATTERN = re.compile(
+    r'([Dynamic]{7}|[Static]{6})\s+([0-9]+)\s+'
+    r'([0-9a-f]{2}:[0-9a-f]{2}:[0-9a-f]{2}:[0-9a-f]{2}:[0-9a-f]{2}:[0-9a-f]{2})'
+    r'\s+(Gi.+|10Gi.+)')
+
+# Campos de "show loop-protect" indexados por la primera palabra de la
+# linea: (prefijo, campo, patron, es_campo_de_interfaz).
+LOOP_PROTECT_FIELDS = {}
+for field_spec in [
+    ('Loop Protection', 'loop_protection',
+     re.compile(r'Loop Protection\s*:(.+)'), False),
+    ('Transmission Time', 'transmission_time',
+     re.compile(r'Transmission Time\s*:(.+)'), False),
+    ('Shutdown Time', 'shutdown_time',
+     re.compile(r'Shutdown Time\s*:(.+)'), False),
+    ('Loop protect mode is', 'loop_protect_mode',
+     re.compile(r'Loop protect mode is\s(.+)?.'), True),
+    ('Action is', 'action', re.compile(r'Action is\s*(.+)?.'), True),
+    ('Actions are both of', 'action',
+     re.compile(r'Actions are both of\s*(.+)?.'), True),
+    ('Transmit mode is', 'transmit_mode',
+     re.compile(r'Transmit mode is\s*(.+)?.'), True),
+    ('No loop', 'loop_status', None, True),
+    ('Loop is detected', 'loop_status', None, True),
+    ('The number of loops is', 'number_of_loops',
+     re.compile(r'The number of loops is\s*(.+)?.'), True),
+    ('Time of last loop is at', 'time_of_last_loop',
+     re.compile(r'Time of last loop is at\s*(.+)'), True),
+    ('Status is', 'status', re.compile(r'Status is\s*(.+)?.'), True),
+]:
+    LOOP_PROTECT_FIELDS.setdefault(
+        field_spec[0].split()[0], []).append(field_spec)
+
+
+# Comandos de vlan por interfaz de los que se toma la primera aparicion.
+SWITCHPORT_VLAN_COMMANDS = [
+    "switchport access vlan",
+    "switchport trunk allowed vlan",
+    "switchport trunk native vlan",
+    "switchport hybrid allowed vlan",
+    "switchport hybrid native vlan",
+]
+
+# Perfiles de recoleccion: salidas de _get_commands (por "information")
+# que se toman y parsean en cada perfil. Todos incluyen "show version",
+# de donde sale el hostname.
+COLLECTION_PROFILES = {
+    "full-backup": [
+        "cnfg_txt", "mac_add_txt", "int_status_txt", "ddmi_status_txt",
+        "system_status_txt", "lp_status_txt"
+    ],
+    "normalization": ["cnfg_txt", "int_status_txt", "system_status_txt"],
+    "port-status": [
+        "int_status_txt", "ddmi_status_txt", "system_status_txt",
+        "lp_status_txt"
+    ],
+    "inventory": ["int_status_txt", "ddmi_status_txt", "system_status_txt"],
+}
 
 
 class TransitionDevice():
-    def __init__(self, device_model_id, mgmt_ip, device_model, credentials):
+    # Timeout de lectura si todavia no se midio el RTT del equipo.
+    DEFAULT_READ_TIMEOUT = 30
+
+    def __init__(self, device_model_id, mgmt_ip, device_model, credentials,
+                 session_manager=None, exec_mode="delay",
+                 timing_calibration=None, legacy_vlan_lists=False,
+                 replay_dir=None, record_dir=None, metrics=None,
+                 collection_profile="full-backup"):
 
         self.device_model_id = device_model_id
         self.mgmt_ip = mgmt_ip
         self.device_model = device_model
         self.credentials = credentials
+        self.session_manager = session_manager
+        # exec_mode "delay": send_command con los delay factor de netmiko.
+        # exec_mode "prompt": se lee hasta el prompt del equipo, con
+        # read_timeout calibrado segun el RTT del find_prompt.
+        # exec_mode "pipelined": todos los show se envian juntos en un
+        # unico intercambio y la salida se separa por el prompt.
+        # exec_mode "streaming": cada salida se parsea linea a linea
+        # mientras se recibe del canal.
+        self.exec_mode = exec_mode
+        self.timing_calibration = timing_calibration
+        # Con legacy_vlan_lists las VLAN de cada interfaz y los rangos de la
+        # tabla de VLAN se expanden a listas de enteros (formato anterior)
+        # en lugar de usar VlanSet.
+        self.legacy_vlan_lists = legacy_vlan_lists
+        # Con replay_dir las salidas se leen de archivos grabados en lugar
+        # de conectarse al equipo; con record_dir las salidas crudas de
+        # cada equipo se graban en ese formato.
+        self.replay_dir = replay_dir
+        self.record_dir = record_dir
+        # RunMetrics opcional: tiempos y tamanos por equipo y por comando.
+        self.metrics = metrics
+        if collection_profile not in COLLECTION_PROFILES:
+            raise ValueError(
+                f"Perfil de recoleccion desconocido: {collection_profile}")
+        self.collection_profile = collection_profile
+        self._prompt = None
+        self._read_timeout = None
+
+    def _access_switch(self, global_delay_factor, **extra_params):
+        access_switch = {
+            'device_type': 'cisco_ios',
+            'host': self.mgmt_ip,
+            'username': self.credentials['username'],
+            'password': self.credentials['password'],
+            'global_delay_factor': global_delay_factor
+        }
+        if self.exec_mode in ("prompt", "pipelined", "streaming"):
+            access_switch['global_delay_factor'] = 1
+            access_switch['fast_cli'] = True
+        access_switch.update(extra_params)
+        return access_switch
+
+    def _init_prompt(self, net_connect):
+        # El find_prompt es la muestra de RTT en todos los modos: su tiempo
+        # no depende del tamano de ninguna salida, como si pasa con el
+        # primer comando show (el running-config en la mayoria de perfiles).
+        start_time = time.monotonic()
+        self._prompt = net_connect.find_prompt()
+        self._calibrate(time.monotonic() - start_time)
+
+    def _calibrate(self, rtt):
+        if self.timing_calibration:
+            self._read_timeout = self.timing_calibration.record(
+                self.mgmt_ip, rtt)
+        else:
+            self._read_timeout = \
+                TimingCalibration.read_timeout_from_rtt(rtt)
+        logger.info(
+            f"RTT del equipo {self.mgmt_ip}: {rtt:.2f} seg. "
+            f"Read timeout calibrado: {self._read_timeout} seg.")
+
+    def _send_show_command(self, net_connect, command):
+        if self.exec_mode == "delay":
+            return net_connect.send_command(command)
+
+        if self._prompt is None:
+            self._init_prompt(net_connect)
+
+        show_content = net_connect.send_command(
+            command,
+            expect_string=re.escape(self._prompt),
+            read_timeout=self._read_timeout or self.DEFAULT_READ_TIMEOUT
+        )
+
+        return show_content
+
+    def _record_metric(self, event, **fields):
+        if self.metrics:
+            self.metrics.record(self.mgmt_ip, event, **fields)
+
+    @contextmanager
+    def _timed(self, event, **fields):
+        # Mide el bloque solo si hay un RunMetrics; el diccionario entregado
+        # permite agregar campos (bytes, retries, ...) al evento.
+        if self.metrics:
+            with self.metrics.timer(self.mgmt_ip, event, **fields) as fields:
+                yield fields
+        else:
+            yield fields
+
+    def _open_connection(self, access_switch):
+        with self._timed("connect"):
+            if self.replay_dir:
+                return ReplayConnection(
+                    self.replay_dir, self.mgmt_ip,
+                    {command['command']: command['information']
+                     for command in self._get_commands()})
+            return ConnectHandler(**access_switch)
+
+    @contextmanager
+    def _connection(self, access_switch):
+        if self.replay_dir:
+            yield self._open_connection(access_switch)
+            return
+
+        # Con un SessionManager la sesion queda abierta al terminar, para
+        # que la siguiente etapa (deploy) la reutilice sin volver a loguear.
+        if self.session_manager:
+            with self.session_manager.session(
+                    self.mgmt_ip,
+                    lambda: self._open_connection(access_switch)
+            ) as net_connect:
+                # La sesion puede venir de otra etapa: se aplican los tiempos
+                # de esta (por ejemplo el delay factor 2 del deploy en lugar
+                # del 5 de la toma de informacion).
+                net_connect.global_delay_factor = \
+                    access_switch['global_delay_factor']
+                if 'fast_cli' in access_switch:
+                    net_connect.fast_cli = access_switch['fast_cli']
+                yield net_connect
+        else:
+            net_connect = self._open_connection(access_switch)
+            try:
+                yield net_connect
+            finally:
+                net_connect.disconnect()
 
     def _get_loop_protect_status(self, lp_status_txt):
 
@@ -22,86 +237,53 @@ class TransitionDevice():
             'lp_interface_status': lp_interface_status
         }
 
+        # Una sola pasada: cada linea se despacha segun su primera palabra
+        # y solo se evalua el patron del campo que corresponde.
         for line in lp_status_txt:
-            try:
-                # Global Loop-Protect Status
-                lp_global_status = re.search(r'Loop Protection\s*:(.+)', line)
-                if lp_global_status is not None:
-                    lp_status["lp_global_status"]['loop_protection'] = (
-                        lp_global_status.group(1)).lstrip()
-
-                lp_tx_time = re.search(r'Transmission Time\s*:(.+)', line)
-                if lp_tx_time is not None:
-                    lp_status["lp_global_status"]['transmission_time'] = (
-                        lp_tx_time.group(1)).lstrip()
-
-                shutdown_time = re.search(r'Shutdown Time\s*:(.+)', line)
-                if shutdown_time is not None:
-                    lp_status["lp_global_status"]['shutdown_time'] = (
-                        shutdown_time.group(1)).lstrip()
+            stripped_line = line.strip()
+
+            # Una linea vacia cierra el bloque de la interfaz.
+            if not stripped_line:
+                if "" == line and interface_line:
+                    interface_line = False
+                    lp_interface_status.append(lp_intfc_info)
+                    lp_intfc_info = {}
+                continue
+
+            for prefix, field, pattern, interface_field in LOOP_PROTECT_FIELDS.get(
+                    stripped_line.split(None, 1)[0], ()):
+                if not stripped_line.startswith(prefix):
+                    continue
+                if interface_field and not interface_line:
+                    break
+
+                if pattern is None:
+                    # "No loop." / "Loop is detected."
+                    lp_intfc_info[field] = prefix
+                    break
 
+                value = pattern.search(line)
+                if value is None or value.group(1) is None:
+                    break
+                if interface_field:
+                    if field == 'loop_protect_mode':
+                        lp_intfc_info[field] = value.group(1).lstrip()
+                    else:
+                        lp_intfc_info[field] = value.group(1)
+                else:
+                    lp_status['lp_global_status'][field] = \
+                        value.group(1).lstrip()
+                break
+            else:
                 # Interface Loop-Protect Status
-                interface = re.search(r'([0-1a-zA-Z]+)\s+(1/.+)', line)
+                interface = INTERFACE_PATTERN.search(line)
                 if interface is not None:
                     lp_intfc_info["interface"] = interface.group(0)
                     interface_line = True
 
-                if interface_line:
-                    loop_protect_mode = re.search(
-                        r'Loop protect mode is\s(.+)?.', line)
-                    if loop_protect_mode is not None:
-                        lp_intfc_info["loop_protect_mode"] = \
-                            loop_protect_mode.group(1).lstrip()
-
-                    action = re.search(r'Action is\s*(.+)?.', line)
-                    if action is not None:
-                        lp_intfc_info["action"] = action.group(1)
-
-                    action = re.search(r'Actions are both of\s*(.+)?.', line)
-                    if action is not None:
-                        lp_intfc_info["action"] = action.group(1)
-
-                    transmit_mode = re.search(
-                        r'Transmit mode is\s*(.+)?.', line)
-                    if transmit_mode is not None:
-                        lp_intfc_info["transmit_mode"] = \
-                            transmit_mode.group(1)
-
-                    loop_status = re.search(r'No loop.', line)
-                    if loop_status is not None:
-                        lp_intfc_info["loop_status"] = "No loop"
-
-                    loop_status = re.search(r'Loop is detected.', line)
-                    if loop_status is not None:
-                        lp_intfc_info["loop_status"] = "Loop is detected"
-
-                    number_of_loops = re.search(
-                        r'The number of loops is\s*(.+)?.', line)
-                    if number_of_loops is not None:
-                        lp_intfc_info["number_of_loops"] = \
-                            number_of_loops.group(1)
-
-                    time_of_last_loop = re.search(
-                        r'Time of last loop is at\s*(.+)', line)
-                    if time_of_last_loop is not None:
-                        lp_intfc_info["time_of_last_loop"] = \
-                            time_of_last_loop.group(1)
-
-                    status = re.search(
-                        r'Status is\s*(.+)?.', line)
-                    if status is not None:
-                        lp_intfc_info["status"] = status.group(1)
-
-                    # Check if it is the last line or if it
-                    # finished reading the interface DDMI
-                    if ("" == line and interface_line or
-                            lp_status_txt[-1] == line and interface_line):
-                        interface_line = False
-                        lp_interface_status.append(lp_intfc_info)
-                        lp_intfc_info = {}
-
-            except AttributeError:
-                continue
+        # La ultima interfaz puede no estar seguida de una linea vacia.
+        if interface_line:
+            lp_interface_status.append(lp_intfc_info)
 
         return lp_status
 
@@ -141,39 +323,33 @@ class TransitionDevice():
 
         return commands
 
+    def _get_profile_commands(self):
+        # Comandos de _get_commands que usa el perfil de recoleccion.
+        profile_sections = COLLECTION_PROFILES[self.collection_profile]
+        return [
+            command for command in self._get_commands()
+            if command['information'] in profile_sections
+        ]
+
     def _get_hostname(self, cnfg_txt):
         for line in cnfg_txt:
             if "hostname " in line:
                 hostname = line.split()[1]
                 return hostname
 
-    def _get_interfaces(self, cnfg_txt):
+    def _get_interfaces(self, config_index):
 
         def get_untagged_vlan(config_line):
             vlan = config_line.split()
-            vlan = [int(vlan[3])]
-            return vlan
+            return int(vlan[3])
 
         def get_tagged_vlan(config_line):
             vlans = config_line.split()
             del vlans[0:4]
-            vlans = vlans[0].split(",")
-            vlan_list = []
-            for i in range(len(vlans)):
-                if "-" in vlans[i]:
-                    vlan_range = vlans[i].split('-')
-                    vlan_range = (
-                        list(
-                            range(
-                                int(vlan_range[0]),
-                                int(vlan_range[1])+1))
-                    )
-                    vlan_list.extend(vlan_range)
-                elif "none" in vlans[i]:
-                    vlan_list = []
-                else:
-                    vlan_list.append(int(vlans[i]))
-            return vlan_list
+            vlan_set = VlanSet.from_string(vlans[0])
+            if self.legacy_vlan_lists:
+                return vlan_set.to_list()
+            return vlan_set
 
         def get_native_vlan(config_line):
             native_vlan = config_line.split()
@@ -185,35 +361,11 @@ class TransitionDevice():
             '10GigabitEthernet': [],
         }
 
-        interface_type = [
-            'interface GigabitEthernet 1/',
-            'interface 10GigabitEthernet 1/'
-        ]
-
-        interface_cngf = []
-        list_int_cnfg = []
-
-        # Creamos una lista con la informacion completa de cada interfaz
-        found_intf = False
-        for line in cnfg_txt:
-            if (
-                interface_type[0] in line or
-                interface_type[1] in line
-            ):
-                found_intf = True
-
-            if found_intf:
-                interface_cngf.append(line)
-
-            if found_intf and line == "!":
-                found_intf = False
-                list_int_cnfg.append(interface_cngf)
-                interface_cngf = []
-
         # Tomamos la informacion necesaria de cada interfaz para
-        # la creacion del diccionario
+        # la creacion del diccionario, recorriendo una sola vez las
+        # lineas de cada bloque del indice de la configuracion.
 
-        for cnfg_interface in list_int_cnfg:
+        for cnfg_interface in config_index['interfaces']:
             admin_state = "enabled"
             port_channel = {
                 "admin_state": "disabled",
@@ -239,8 +391,12 @@ class TransitionDevice():
 
             if_descrp = None
 
-            # Buscamos los datos basico de la interfaz
+            # Primera linea de cada comando "switchport" relevante.
+            sw_mode = None
+            switchport_lines = {}
+
             for line_cnfg in cnfg_interface:
+                # Buscamos los datos basico de la interfaz
                 if "interface GigabitEthernet 1/" in line_cnfg:
                     inf_type = line_cnfg.replace("interface ", "")
                     speed_cnfg = "auto"
@@ -289,9 +445,8 @@ class TransitionDevice():
                     if "speed auto" in line_cnfg:
                         speed_cnfg = "auto"
 
-            # Buscamos informacion relacionada a port-channel
-            if self.device_model['model'] == "LIB4424":
-                for line_cnfg in cnfg_interface:
+                # Buscamos informacion relacionada a port-channel
+                if self.device_model['model'] == "LIB4424":
                     if "mode active" in line_cnfg:
                         port_channel['admin_state'] = "enabled"
                         port_channel['mode'] = "lacp"
@@ -309,8 +464,7 @@ class TransitionDevice():
                         port_channel['mode'] = "static"
                         lacp_key = line_cnfg.split()
                         port_channel['key'] = int(lacp_key[2])
-            elif self.device_model['model'] == "S4224":
-                for line_cnfg in cnfg_interface:
+                elif self.device_model['model'] == "S4224":
                     if " lacp" == line_cnfg:
                         port_channel['admin_state'] = "enabled"
                         port_channel['mode'] = "lacp"
@@ -322,59 +476,48 @@ class TransitionDevice():
                         lacp_key = line_cnfg.split()
                         port_channel['key'] = int(lacp_key[2])
 
+                # Guardamos la primera aparicion de cada comando switchport,
+                # se interpretan al terminar el bloque segun el modo.
+                if "switchport" in line_cnfg:
+                    if sw_mode is None:
+                        if "switchport mode trunk" in line_cnfg:
+                            sw_mode = "trunk"
+                        elif "switchport mode hybrid" in line_cnfg:
+                            sw_mode = "hybrid"
+                    for switchport_cmd in SWITCHPORT_VLAN_COMMANDS:
+                        if (switchport_cmd in line_cnfg and
+                                switchport_cmd not in switchport_lines):
+                            switchport_lines[switchport_cmd] = line_cnfg
+
             # Buscamos el "switchport mode" de la interfaz
-            for line_cnfg in cnfg_interface:
-                if "switchport mode trunk" in line_cnfg:
-                    sw_mode = "trunk"
-                    break
-                elif "switchport mode hybrid" in line_cnfg:
-                    sw_mode = "hybrid"
-                    break
-            else:
+            if sw_mode is None:
                 sw_mode = "access"
 
             # Buscamos las vlan segun el "switchport mode":
             if sw_mode == "access":
-                for line_cnfg in cnfg_interface:
-                    if "switchport access vlan" in line_cnfg:
-                        vlans = get_untagged_vlan(line_cnfg)
-                        native_vlan = vlans[0]
-                        break
-                else:
-                    vlans = [1]
-                    native_vlan = vlans[0]
-
-            elif sw_mode == "trunk":
-                # Obtener vlans en el trunk
-                for line_cnfg in cnfg_interface:
-                    if "switchport trunk allowed vlan" in line_cnfg:
-                        vlans = get_tagged_vlan(line_cnfg)
-                        break
+                if "switchport access vlan" in switchport_lines:
+                    native_vlan = get_untagged_vlan(
+                        switchport_lines["switchport access vlan"])
                 else:
-                    vlans = ["All"]
+                    native_vlan = 1
 
-                # Obtener native vlan
-                for line_cnfg in cnfg_interface:
-                    if "switchport trunk native vlan" in line_cnfg:
-                        native_vlan = get_native_vlan(line_cnfg)
-                        break
+                if self.legacy_vlan_lists:
+                    vlans = [native_vlan]
                 else:
-                    native_vlan = [1]
+                    vlans = VlanSet.from_vlans([native_vlan])
 
-            elif sw_mode == "hybrid":
-                # Obtener vlans en el hybrid
-                for line_cnfg in cnfg_interface:
-                    if "switchport hybrid allowed vlan" in line_cnfg:
-                        vlans = get_tagged_vlan(line_cnfg)
-                        break
+            else:
+                # Obtener vlans en el trunk/hybrid
+                allowed_cmd = f"switchport {sw_mode} allowed vlan"
+                if allowed_cmd in switchport_lines:
+                    vlans = get_tagged_vlan(switchport_lines[allowed_cmd])
                 else:
                     vlans = ["All"]
 
                 # Obtener native vlan
-                for line_cnfg in cnfg_interface:
-                    if "switchport hybrid native vlan" in line_cnfg:
-                        native_vlan = get_native_vlan(line_cnfg)
-                        break
+                native_cmd = f"switchport {sw_mode} native vlan"
+                if native_cmd in switchport_lines:
+                    native_vlan = get_native_vlan(switchport_lines[native_cmd])
                 else:
                     native_vlan = [1]
 
@@ -410,89 +553,105 @@ class TransitionDevice():
 
         return interfaces
 
+    def _index_configuration(self, cnfg_txt):
+        # Recorre la configuracion una unica vez y la separa en secciones:
+        # bloques de interfaces fisicas, bloques de vlan y el resto (global).
+        # Cada bloque incluye el "!" que lo cierra.
+        config_index = {
+            'global': [],
+            'interfaces': [],
+            'vlans': []
+        }
+
+        interface_cngf = None
+        vlan_cnfg = None
+
+        for line in cnfg_txt:
+            if (
+                'interface GigabitEthernet 1/' in line or
+                'interface 10GigabitEthernet 1/' in line
+            ):
+                if interface_cngf is None:
+                    interface_cngf = []
+            elif vlan_cnfg is None and "vlan" in line:
+                if len(line.split()) == 2:
+                    vlan_cnfg = []
+
+            if interface_cngf is None and vlan_cnfg is None:
+                config_index['global'].append(line)
+                continue
+
+            if interface_cngf is not None:
+                interface_cngf.append(line)
+                if line == "!":
+                    config_index['interfaces'].append(interface_cngf)
+                    interface_cngf = None
+
+            if vlan_cnfg is not None:
+                vlan_cnfg.append(line)
+                if line == "!":
+                    config_index['vlans'].append(vlan_cnfg)
+                    vlan_cnfg = None
+
+        return config_index
+
     def _get_configuration(self, plain_text_config):
         configuration = {}
-        configuration["cnfg_txt"] = plain_text_config
-        cnfg_txt = plain_text_config.split('\n')
+        if isinstance(plain_text_config, str):
+            config_index = self._index_configuration(
+                plain_text_config.split('\n'))
+            configuration["cnfg_txt"] = plain_text_config
+        else:
+            # Iterador de lineas (modo streaming): se indexa a medida que
+            # llegan las lineas y se conserva el texto para el backup.
+            cnfg_txt = []
+
+            def config_lines():
+                for line in plain_text_config:
+                    cnfg_txt.append(line)
+                    yield line
+
+            config_index = self._index_configuration(config_lines())
+            configuration["cnfg_txt"] = '\n'.join(cnfg_txt)
         configuration["cnfg_json"] = {
-            "cnfg_interfaces": self._get_interfaces(cnfg_txt),
-            "cnfg_vlans": self._get_vlans(cnfg_txt)
+            "cnfg_interfaces": self._get_interfaces(config_index),
+            "cnfg_vlans": self._get_vlans(config_index)
         }
 
         return configuration
 
     def _get_mac_table(self, mac_add_txt):
-        mac_db = []
+        mac_db = MacTable()
 
         for line in mac_add_txt:
-            try:
-                mac_type, vlan_id, mac, interface = re.search(
-                    r'([Dynamic]{7}|[Static]{6})\s+([0-9]+)\s+([0-9a-f]{2}:[0-9a-f]{2}:[0-9a-f]{2}:[0-9a-f]{2}:[0-9a-f]{2}:[0-9a-f]{2})\s+(Gi.+|10Gi.+)',
-                    line).groups()
-
-                if "," in interface and interface.startswith("Giga"):
-                    multi_inter = (
-                        interface.replace(
-                            "GigabitEthernet 1/", "")).split(",")
-                    for a in multi_inter:
-                        mac_db.append(
-                            dict(
-                                mac_type=mac_type,
-                                vlan_id=vlan_id,
-                                mac=mac,
-                                interface="".join(["GigabitEthernet 1/", a])
-                            )
-                        )
-                elif "-" in interface and interface.startswith("Giga"):
-                    multi_inter = (
-                        interface.replace(
-                            "GigabitEthernet 1/", "")).split("-")
-                    for a in multi_inter:
-                        mac_db.append(
-                            dict(
-                                mac_type=mac_type,
-                                vlan_id=vlan_id,
-                                mac=mac,
-                                interface="".join(["GigabitEthernet 1/", a])
-                            )
-                        )
-                elif "," in interface and interface.startswith("10Giga"):
-                    multi_inter = (
-                        interface.replace(
-                            "10GigabitEthernet 1/", "")).split(",")
-                    for a in multi_inter:
-                        mac_db.append(
-                            dict(
-                                mac_type=mac_type,
-                                vlan_id=vlan_id,
-                                mac=mac,
-                                interface="".join(["10GigabitEthernet 1/", a])
-                            )
-                        )
-                elif "-" in interface and interface.startswith("10Giga"):
-                    multi_inter = (
-                        interface.replace(
-                            "10GigabitEthernet 1/", "")).split("-")
-                    for a in multi_inter:
-                        mac_db.append(
-                            dict(
-                                mac_type=mac_type,
-                                vlan_id=vlan_id,
-                                mac=mac,
-                                interface="".join(["10GigabitEthernet 1/", a])
-                            )
-                        )
-                else:
-                    mac_db.append(
-                        dict(
-                            mac_type=mac_type,
-                            vlan_id=vlan_id,
-                            mac=mac,
-                            interface=interface
-                        )
-                    )
-            except AttributeError:
+            mac_entry = MAC_ENTRY_PATTERN.search(line)
+            if mac_entry is None:
                 continue
+            mac_type, vlan_id, mac, interface = mac_entry.groups()
+
+            # Las entradas con varios puertos ("GigabitEthernet 1/3,5" o
+            # "GigabitEthernet 1/2-3") se cargan una vez por puerto.
+            if interface.startswith("Giga"):
+                if_prefix = "GigabitEthernet 1/"
+            elif interface.startswith("10Giga"):
+                if_prefix = "10GigabitEthernet 1/"
+            else:
+                if_prefix = None
+
+            if if_prefix is None:
+                mac_db.append(mac_type, vlan_id, mac, interface)
+                continue
+            elif "," in interface:
+                multi_inter = interface.replace(if_prefix, "").split(",")
+            elif "-" in interface:
+                multi_inter = interface.replace(if_prefix, "").split("-")
+            else:
+                mac_db.append(mac_type, vlan_id, mac, interface)
+                continue
+
+            for a in multi_inter:
+                mac_db.append(
+                    mac_type, vlan_id, mac, "".join([if_prefix, a]))
 
         return mac_db
 
@@ -542,45 +701,112 @@ class TransitionDevice():
 
         return ddmi_status
 
-    def _get_interface_status(self, int_status_txt, ddmi_status):
+    def _interface_status_entry(self, interface, num, admin_mode,
+                                speed_duplex, flow_control, mtu, excessive,
+                                link_state, link_medium):
+        if not link_medium or link_medium == " ":
+            link_medium = None
+
+        return dict(
+            interface_type=interface,
+            interface_full_name=" ".join(
+                [interface, num.replace(" ", "")]),
+            interface_name=num.replace("1/", "").replace(" ", ""),
+            admin_mode=admin_mode,
+            speed_duplex=speed_duplex,
+            flow_control=flow_control,
+            mtu=mtu,
+            excessive=excessive,
+            link_state=link_state,
+            link_medium=link_medium
+        )
+
+    def _parse_interface_status_tokens(self, line):
+        # Fila cuyo contenido se desplazo de las columnas del encabezado:
+        # los valores no llevan espacios, salvo el nombre de la interfaz.
+        values = line.split()
+        if (len(values) in (8, 9) and values[1].startswith("1/") and
+                values[5].isdigit()):
+            # Sin "Media" (por ejemplo puertos Down sin SFP).
+            if len(values) == 8:
+                values.append(None)
+            return self._interface_status_entry(*values)
+
+    def _parse_interface_status_regex(self, line):
+        # Parser por expresion regular, usado cuando la salida no tiene
+        # encabezado o la fila no respeta las columnas del encabezado.
+        interface_row = INTERFACE_STATUS_PATTERN.search(line)
+        if interface_row is not None:
+            return self._interface_status_entry(*interface_row.groups())
+
+    def _get_interface_status_columns(self, header_line):
+        # Posicion de inicio de cada columna del encabezado, por ejemplo
+        # "Interface", "Mode", "Speed & Duplex", "Flow Control", ...
+        columns = [column.start() for column in
+                   INTERFACE_STATUS_HEADER_COLUMN.finditer(header_line)]
+        if len(columns) == len(INTERFACE_STATUS_FIELDS):
+            return columns
+
+    def _parse_interface_status_row(self, line, columns):
+        # Cada columna empieza luego de un espacio: si no es asi el valor
+        # de la columna anterior se desplazo y la fila no es de ancho fijo.
+        for start in columns[1:]:
+            if len(line) > start and line[start - 1] != " ":
+                return None
+
+        values = [line[start:end].strip() for start, end in
+                  zip(columns, columns[1:] + [None])]
+
+        interface_name = INTERFACE_NAME_PATTERN.match(values[0])
+        if interface_name is None or not values[4].isdigit():
+            return None
+
+        return self._interface_status_entry(
+            *interface_name.groups(), *values[1:])
+
+    def _get_interface_status_rows(self, int_status_txt):
 
         interface_status = []
+        columns = None
 
         for line in int_status_txt:
-            try:
-                interface, num, admin_mode, speed_duplex, flow_control, mtu, excessive, link_state, link_medium = re.search(
-                    r'([0-1a-zA-Z]+)\s+(1/.+)\s+([a-z]+)\s+([0-1A-Za-z]+)\s+([a-z]+)\s+([0-9]+)\s+([A-Za-z]+)\s+([0-1A-Za-z]+)\s+(.+)', line).groups()
+            if columns is None and line.lstrip().startswith("Interface"):
+                # El encabezado define las columnas una unica vez.
+                columns = self._get_interface_status_columns(line)
+                if columns is not None:
+                    continue
+
+            if_status = None
+            if columns is not None:
+                if_status = self._parse_interface_status_row(line, columns)
+                if if_status is None:
+                    if_status = self._parse_interface_status_tokens(line)
+            if if_status is None:
+                if_status = self._parse_interface_status_regex(line)
+
+            if if_status is not None:
+                interface_status.append(if_status)
 
-                if link_medium == " ":
-                    link_medium = None
-
-                interface_status.append(
-                    dict(
-                        interface_type=interface,
-                        interface_full_name=" ".join(
-                            [interface, num.replace(" ", "")]),
-                        interface_name=num.replace("1/", "").replace(" ", ""),
-                        admin_mode=admin_mode,
-                        speed_duplex=speed_duplex,
-                        flow_control=flow_control,
-                        mtu=mtu,
-                        excessive=excessive,
-                        link_state=link_state,
-                        link_medium=link_medium
-                    )
-                )
+        return interface_status
 
-            except AttributeError:
-                continue
+    def _attach_ddmi_status(self, interface_status, ddmi_status):
+        # Indexamos el DDMI por interfaz (se conserva el primer registro de
+        # cada una) para unirlo con el estado en una sola pasada.
+        ddmi_by_interface = {}
+        for ddmi in ddmi_status:
+            ddmi_by_interface.setdefault(ddmi.get('interface'), ddmi)
 
         for if_status in interface_status:
-            for ddmi in ddmi_status:
-                if if_status['interface_full_name'] == ddmi['interface']:
-                    if_status['ddmi_information'] = ddmi
-                    break
+            ddmi = ddmi_by_interface.get(if_status['interface_full_name'])
+            if ddmi is not None:
+                if_status['ddmi_information'] = ddmi
 
         return interface_status
 
+    def _get_interface_status(self, int_status_txt, ddmi_status):
+        return self._attach_ddmi_status(
+            self._get_interface_status_rows(int_status_txt), ddmi_status)
+
     def _get_system_status(self, system_status_txt):
         system_info = {}
 
@@ -640,141 +866,350 @@ class TransitionDevice():
 
         return uplink_ports
 
-    def _serializer(self, sw_txt_information):
-        # Realizamos un split de los output
-        plain_text_config = sw_txt_information['cnfg_txt']
-        # cnfg_txt = sw_txt_information['cnfg_txt'].split('\n')
-        mac_add_txt = sw_txt_information['mac_add_txt'].split('\n')
-        int_status_txt = sw_txt_information['int_status_txt'].split('\n')
-        ddmi_status_txt = sw_txt_information['ddmi_status_txt'].split('\n')
-        system_status_txt = sw_txt_information['system_status_txt'].split('\n')
-        lp_status_txt = sw_txt_information['lp_status_txt'].split('\n')
-
-        sw_data = {}
-
-        configuration = self._get_configuration(
-            plain_text_config)
-
-        sw_data['configuration'] = {
-            "cnfg_txt": configuration['cnfg_txt']
+    def _get_section_parsers(self):
+        # Parser de cada salida de _get_commands, indexado por "information".
+        # Todos aceptan el texto completo o un iterador de lineas.
+        return {
+            "cnfg_txt": self._get_configuration,
+            "mac_add_txt": self._get_mac_table,
+            "int_status_txt": self._get_interface_status_rows,
+            "ddmi_status_txt": self._get_ddmi_status,
+            "system_status_txt": self._get_system_status,
+            "lp_status_txt": self._get_loop_protect_status
         }
 
-        sw_data['serialized_configuration'] = {
-            "cnfg_json": configuration['cnfg_json']
-        }
+    def _parse_section(self, information, content):
+        # El running-config se recibe completo porque tambien se guarda
+        # como texto; el resto de las salidas se parsea linea a linea.
+        if isinstance(content, str) and information != "cnfg_txt":
+            content = content.split('\n')
+        return self._get_section_parsers()[information](content)
+
+    def _serialize_section(self, information, content):
+        with self._timed(
+                "parse",
+                method=self._get_section_parsers()[information].__name__):
+            return self._parse_section(information, content)
+
+    def _snapshot(self, sw_txt_information, parsed_sections=None):
+        # Snapshot con las secciones del perfil; se parsean al consultarlas.
+        return DeviceSnapshot(
+            self, sw_txt_information, parsed_sections,
+            COLLECTION_PROFILES[self.collection_profile])
 
-        sw_data['mac_table_status'] = {
-            'mac_table': self._get_mac_table(mac_add_txt)
-        }
+    def _serializer(self, sw_txt_information):
+        return self._snapshot(sw_txt_information).to_dict()
+
+    def _is_short_output(self, show_content):
+        return len(show_content.split("\n")) < 4
+
+    def _is_truncated_output(self, show_content):
+        # None: bloque del modo pipelined que no cerro el prompt.
+        return show_content is None or self._is_short_output(show_content)
+
+    def _build_node_information(self, sw_txt_information):
+        return self._complete_node_information(
+            self._snapshot(sw_txt_information))
+
+    def _complete_node_information(self, node_information):
+        node_information['device_model_id'] = self.device_model_id
+        node_information['mgmt_ip'] = self.mgmt_ip
+        logger.info("Creando SCO ID basado en Hostname del dispositivo...")
+        node_information['sco_id'] = [int(
+            re.findall(r'\d+', node_information['hostname'])[0])]
+        logger.info(
+            "La informacion del equipo " +
+            node_information['hostname'] + " fue tomada con exito."
+        )
+        return node_information
+
+    def _collect_sequential(self, net_connect):
+        sw_txt_information = {}
+
+        retry_flag = True
+        count_retry = 0
+
+        # Execute Show commands
+        for command in self._get_profile_commands():
+            logger.info(
+                command['msg'] + ": " +
+                command['command']
+            )
 
-        ddmi_status = self._get_ddmi_status(ddmi_status_txt)
+            with self._timed(
+                    "command", command=command['command']) as command_metric:
+                while retry_flag and count_retry < 4:
+                    show_content = self._send_show_command(
+                        net_connect, command['command']
+                    )
+                    if self._is_short_output(show_content):
+                        logger.info(
+                            "Some error occurred: The show " +
+                            "output is too short. Retrying..."
+                        )
+                        count_retry += 1
+                    else:
+                        sw_txt_information[command['information']] = \
+                            show_content
+                        retry_flag = False
 
-        sw_data['interface_status'] = {
-            'interfaces': self._get_interface_status(
-                            int_status_txt, ddmi_status)
-        }
+                command_metric['retries'] = count_retry
+                command_metric['bytes'] = len(show_content)
 
-        sw_data['uplink_ports'] = self._get_uplink_ports(
-            sw_data['serialized_configuration'])
+            retry_flag = True
+            count_retry = 0
 
-        sw_data['system_status'] = self._get_system_status(system_status_txt)
-        sw_data['loop_protect_status'] = self._get_loop_protect_status(
-            lp_status_txt)
+        return sw_txt_information
+
+    def _send_pipelined_commands(self, net_connect, commands):
+        # Se escriben todos los comandos de una vez y se lee hasta que el
+        # prompt aparece una vez por comando. El timeout se reinicia cada
+        # vez que llegan datos.
+        prompt_line = re.compile(
+            r'^' + re.escape(self._prompt), flags=re.MULTILINE)
+        read_timeout = self._read_timeout or self.DEFAULT_READ_TIMEOUT
+
+        net_connect.write_channel("\n".join(commands) + "\n")
+
+        output = ""
+        last_read = time.monotonic()
+        while len(prompt_line.findall(output)) < len(commands):
+            data = net_connect.read_channel()
+            if data:
+                output += data.replace('\r', '')
+                last_read = time.monotonic()
+            elif time.monotonic() - last_read > read_timeout:
+                logger.info(
+                    f"Timeout leyendo la salida combinada del equipo {self.mgmt_ip}.")
+                break
+            else:
+                time.sleep(0.01)
+
+        return self._split_pipelined_output(output, commands)
+
+    def _split_pipelined_output(self, output, commands):
+        # Cada bloque de la salida combinada comienza con la linea
+        # "<prompt><comando>" (el eco del comando) y termina en el siguiente
+        # prompt. El primer comando no lleva prompt porque ya fue leido.
+        outputs = []
+        block = []
+        for line in output.split('\n'):
+            if line.startswith(self._prompt):
+                outputs.append(block)
+                block = [line[len(self._prompt):]]
+            else:
+                block.append(line)
+        outputs.append(block)
+
+        show_contents = []
+        for index, (command, block) in enumerate(zip(commands, outputs)):
+            # Un bloque solo esta completo si lo cierra el prompt (la linea
+            # del eco del comando siguiente o el prompt final). Si la
+            # lectura se corto (timeout) el ultimo bloque queda abierto: se
+            # devuelve None, como los bloques que no llegaron, para que se
+            # reintente individualmente.
+            if index + 1 >= len(outputs):
+                show_contents.append(None)
+                continue
+            if block and block[0].strip() == command:
+                del block[0]
+            show_contents.append('\n'.join(block))
+
+        show_contents.extend([None] * (len(commands) - len(show_contents)))
+        return show_contents
+
+    def _collect_pipelined(self, net_connect):
+        sw_txt_information = {}
+        commands = self._get_profile_commands()
+
+        self._init_prompt(net_connect)
+        # Paginado deshabilitado una unica vez para toda la sesion.
+        net_connect.disable_paging(command="terminal length 0")
+
+        logger.info(
+            "Ejecutando en un unico envio: " +
+            ", ".join([command['command'] for command in commands])
+        )
+        with self._timed("pipelined_exchange") as exchange_metric:
+            show_contents = self._send_pipelined_commands(
+                net_connect, [command['command'] for command in commands])
+            exchange_metric['bytes'] = sum(
+                [len(show_content or "") for show_content in show_contents])
+
+        if any(self._is_truncated_output(show_content)
+               for show_content in show_contents):
+            # Descartamos restos de la salida combinada antes de reintentar.
+            net_connect.clear_buffer()
+
+        for command, show_content in zip(commands, show_contents):
+            count_retry = 0
+            # El tiempo del intercambio combinado queda en
+            # "pipelined_exchange"; cada comando solo mide sus reintentos.
+            with self._timed(
+                    "command", command=command['command']) as command_metric:
+                # Solo se reintenta el comando cuya salida vino truncada.
+                while (self._is_truncated_output(show_content) and
+                       count_retry < 3):
+                    logger.info(
+                        "Some error occurred: The show output of '" +
+                        command['command'] + "' is truncated. Retrying..."
+                    )
+                    show_content = self._send_show_command(
+                        net_connect, command['command'])
+                    count_retry += 1
+
+                command_metric['retries'] = count_retry
+                command_metric['bytes'] = len(show_content or "")
+
+            # Sin la salida completa el comando no se guarda: el armado del
+            # snapshot falla y el equipo queda como error de toma de info.
+            if not self._is_truncated_output(show_content):
+                sw_txt_information[command['information']] = show_content
+
+        return sw_txt_information
+
+    def _stream_command_lines(self, net_connect, command, stream_stats):
+        # Envia el comando y entrega cada linea de la salida apenas llega
+        # por el canal, sin esperar la salida completa. Termina al recibir
+        # el prompt del equipo; si antes vence el timeout, la salida quedo
+        # cortada y se marca en stream_stats['timed_out'].
+        read_timeout = self._read_timeout or self.DEFAULT_READ_TIMEOUT
+        net_connect.write_channel(command + "\n")
+
+        pending_line = ""
+        echo_line = True
+        last_read = time.monotonic()
+        while True:
+            data = net_connect.read_channel()
+            if not data:
+                if time.monotonic() - last_read > read_timeout:
+                    logger.info(
+                        f"Timeout leyendo '{command}' del equipo {self.mgmt_ip}.")
+                    stream_stats['timed_out'] = True
+                    return
+                time.sleep(0.01)
+                continue
 
-        sw_data['os_version'] = sw_data['system_status']['os_version']
-        sw_data['hostname'] = sw_data['system_status']['system_name']
-        sw_data['serialnumber'] = sw_data['system_status']['serialnumber']
+            last_read = time.monotonic()
+            stream_stats['bytes'] += len(data)
+            lines = (pending_line + data.replace('\r', '')).split('\n')
+            pending_line = lines.pop()
 
-        return sw_data
+            for line in lines:
+                # La primera linea es el eco del comando.
+                if echo_line:
+                    echo_line = False
+                    if command in line:
+                        continue
+                stream_stats['lines'] += 1
+                yield line
 
-    def retrieve_information(self):
-        try:
-            access_switch = {
-                'device_type': 'cisco_ios',
-                'host': self.mgmt_ip,
-                'username': self.credentials['username'],
-                'password': self.credentials['password'],
-                'global_delay_factor': 5,
-                'timeout': 30
-            }
+            # El prompt solo cierra la salida luego del eco del comando.
+            if not echo_line and pending_line.strip() == self._prompt.strip():
+                return
 
-            logger.info("Conectando al equipo: "+self.mgmt_ip)
-            net_connect = None
-            net_connect = ConnectHandler(**access_switch)
+    def _collect_streaming(self, net_connect):
+        parsed_sections = {}
 
-            sw_txt_information = {}
+        self._init_prompt(net_connect)
+        net_connect.disable_paging(command="terminal length 0")
 
-            retry_flag = True
-            count_retry = 0
+        for command in self._get_profile_commands():
+            logger.info(
+                command['msg'] + ": " +
+                command['command']
+            )
 
-            # Execute Show commands
-            for command in self._get_commands():
-                logger.info(
-                    command['msg'] + ": " +
-                    command['command']
-                )
+            # En streaming el tiempo de cada comando incluye el parseo.
+            with self._timed(
+                    "command", command=command['command']) as command_metric:
+                for count_retry in range(4):
+                    stream_stats = {'lines': 0, 'bytes': 0, 'timed_out': False}
+                    # El parser consume las lineas mientras llegan del canal.
+                    parsed_section = self._parse_section(
+                        command['information'],
+                        self._stream_command_lines(
+                            net_connect, command['command'], stream_stats))
+
+                    # Una salida cortada por timeout no se guarda aunque
+                    # tenga lineas: se descarta lo que quede en el canal y
+                    # se vuelve a pedir, como en el modo pipelined.
+                    if (stream_stats['lines'] >= 4 and
+                            not stream_stats['timed_out']):
+                        parsed_sections[command['information']] = \
+                            parsed_section
+                        break
 
-                while retry_flag and count_retry < 4:
-                    show_content = net_connect.send_command(
-                        command['command']
-                    )
-                    if len(show_content.split("\n")) < 4:
+                    if stream_stats['timed_out']:
+                        logger.info(
+                            "Some error occurred: The show output of '" +
+                            command['command'] + "' is truncated. Retrying..."
+                        )
+                    else:
                         logger.info(
                             "Some error occurred: The show " +
                             "output is too short. Retrying..."
                         )
-                        count_retry += 1
-                    else:
-                        sw_txt_information[command['information']] = \
-                            show_content
-                        retry_flag = False
+                    net_connect.clear_buffer()
 
-                retry_flag = True
-                count_retry = 0
+                command_metric['retries'] = count_retry
+                command_metric['bytes'] = stream_stats['bytes']
 
-            # Process the output of each show command
-            node_information = self._serializer(sw_txt_information)
-            node_information['device_model_id'] = self.device_model_id
-            node_information['mgmt_ip'] = self.mgmt_ip
-            logger.info("Creando SCO ID basado en Hostname del dispositivo...")
-            node_information['sco_id'] = [int(
-                re.findall(r'\d+', node_information['hostname'])[0])]
-            logger.info(
-                "La informacion del equipo " +
-                node_information['hostname'] + " fue tomada con exito."
-            )
+        return parsed_sections
+
+    def retrieve_information(self):
+        try:
+            with self._timed("retrieve", ok=False) as retrieve_metric:
+                node_information = self._retrieve_node_information()
+                retrieve_metric['ok'] = True
             return node_information
         except BaseException as e:
             logger.info(e)
             logger.info("No se pudo obtener/guardar"
                   " la informacion del equipo {}".format(
                         self.mgmt_ip))
-        finally:
-            if net_connect:
-                net_connect.disconnect()
+
+    def _retrieve_node_information(self):
+        access_switch = self._access_switch(5, timeout=30)
+
+        logger.info("Conectando al equipo: "+self.mgmt_ip)
+        with self._connection(access_switch) as net_connect:
+            if self.exec_mode == "streaming":
+                # Las salidas se parsean mientras se reciben del canal.
+                parsed_sections = self._collect_streaming(net_connect)
+            elif self.exec_mode == "pipelined":
+                sw_txt_information = self._collect_pipelined(net_connect)
+            else:
+                sw_txt_information = self._collect_sequential(net_connect)
+
+        if self.exec_mode == "streaming":
+            return self._complete_node_information(
+                self._snapshot({}, parsed_sections))
+
+        if self.record_dir:
+            record_outputs(
+                self.record_dir, self.mgmt_ip, sw_txt_information)
+
+        # Process the output of each show command
+        return self._build_node_information(sw_txt_information)
 
     def deploy_configuration(self, configuration: list = []):
         if configuration:
             logger.info("Iniciando el envio de configuracion.")
             try:
-                access_switch = {
-                    'device_type': 'cisco_ios',
-                    'host': self.mgmt_ip,
-                    'username': self.credentials['username'],
-                    'password': self.credentials['password'],
-                    'global_delay_factor': 2
-                }
+                access_switch = self._access_switch(2)
 
                 output = False
 
                 logger.info(f"Conectando al equipo: {self.mgmt_ip}")
-                net_connect = False
-                net_connect = ConnectHandler(**access_switch)
-                net_connect.find_prompt()
-                output = net_connect.send_config_set(configuration)
-
-                if net_connect:
-                    net_connect.disconnect()
+                with self._timed(
+                        "deploy", lines=len(configuration),
+                        ok=False) as deploy_metric:
+                    with self._connection(access_switch) as net_connect:
+                        net_connect.find_prompt()
+                        output = net_connect.send_config_set(configuration)
+                    deploy_metric['bytes'] = len(output or "")
+                    deploy_metric['ok'] = bool(output)
 
                 if output:
                     logger.info(output)
@@ -790,16 +1225,13 @@ class TransitionDevice():
 
 class S4224(TransitionDevice):
 
-    def _get_vlans(self, cnfg_txt):
+    def _get_vlans(self, config_index):
         vlans_db = []
-        vlan_cnfg = []
-        list_vlan_cnfg = []
-        flag = False
         vlan_id = None
         vlan_name = None
 
-        # Buscamos en la configuracion TXT (linea por linea)
-        # todas las VLAN y sus atributos, ejecutando un parser.
+        # Recorremos los bloques de VLAN del indice de la configuracion
+        # (cada uno terminado en "!") y obtenemos sus atributos.
         # Ejemplo:
         #
         # vlan 677
@@ -811,27 +1243,7 @@ class S4224(TransitionDevice):
         # vlan 700
         # name Cliente-C
 
-        for line in cnfg_txt:
-            if "vlan" in line:
-                vlan_check = line.split()
-                if len(vlan_check) == 2:
-                    # Este flag nos permite appendear
-                    # la siguiente linea de la config
-                    # correspondiente al nombre de la
-                    # vlan (si es que lo tiene).
-                    flag = True
-
-            if flag:
-                vlan_cnfg.append(line)
-
-            # La configuracion de la VLAN
-            # finaliza con un "!".
-            if flag and line == "!":
-                flag = False
-                list_vlan_cnfg.append(vlan_cnfg)
-                vlan_cnfg = []
-
-        for vlan in list_vlan_cnfg:
+        for vlan in config_index['vlans']:
             if len(vlan) == 2:
                 vlan_id = vlan[0]
                 vlan_id = int(vlan_id.replace("vlan ", ""))
@@ -855,33 +1267,26 @@ class S4224(TransitionDevice):
 
 class LIB4424(TransitionDevice):
 
-    def _get_vlans(self, cnfg_txt):
+    def _get_vlans(self, config_index):
         vlans_db = []
-        vlan_cnfg = []
-        list_vlan_cnfg = []
-        flag = False
         vlan_id = None
         vlan_name = None
 
-        # Creamos una lista con la informacion completa de cada vlan
-        for line in cnfg_txt:
-            if (
-                "vlan" in line
-            ):
-                vlan_check = line.split()
-                if len(vlan_check) == 2:
-                    flag = True
-
-            if flag:
-                vlan_cnfg.append(line)
-
-            if flag and line == "!":
-                flag = False
-                list_vlan_cnfg.append(vlan_cnfg)
-                vlan_cnfg = []
+        # Los bloques con la informacion completa de cada vlan ya vienen
+        # separados en el indice de la configuracion.
+        for vlan in config_index['vlans']:
+            if len(vlan) == 2 and not self.legacy_vlan_lists and (
+                    "," in vlan[0] or "-" in vlan[0]):
+                # Rangos de VLAN: una unica entrada con un VlanSet.
+                vlans_db.append(
+                    dict(
+                        vlan_id=VlanSet.from_string(
+                            vlan[0].replace("vlan ", "")),
+                        vlan_name=vlan_name
+                    )
+                )
 
-        for vlan in list_vlan_cnfg:
-            if len(vlan) == 2:
+            elif len(vlan) == 2:
                 vlan_id = vlan[0]
                 if "," in vlan_id:
                     vlan_id = vlan_id.replace("vlan ", "")
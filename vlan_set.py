@@ -0,0 +1,98 @@
+from bisect import bisect_right
+
+
+class VlanSet():
+    """Conjunto de VLAN guardado como intervalos ordenados y disjuntos.
+
+    Un trunk "1-4094" ocupa un unico intervalo en lugar de 4094 enteros.
+    Se serializa en el mismo formato compacto que usa la configuracion del
+    equipo, por ejemplo "1-100,200".
+    """
+
+    def __init__(self, intervals=()):
+        self._intervals = []
+        for start, end in sorted(intervals):
+            if self._intervals and start <= self._intervals[-1][1] + 1:
+                if end > self._intervals[-1][1]:
+                    self._intervals[-1] = (self._intervals[-1][0], end)
+            else:
+                self._intervals.append((start, end))
+        self._starts = [start for start, end in self._intervals]
+
+    @classmethod
+    def from_string(cls, vlans_txt):
+        # Formato de la configuracion: "10,20-30,40" o "none".
+        intervals = []
+        for vlan in vlans_txt.split(","):
+            if "-" in vlan:
+                start, end = vlan.split("-")
+                intervals.append((int(start), int(end)))
+            elif "none" in vlan:
+                intervals = []
+            else:
+                intervals.append((int(vlan), int(vlan)))
+        return cls(intervals)
+
+    @classmethod
+    def from_vlans(cls, vlans):
+        return cls([(int(vlan), int(vlan)) for vlan in vlans])
+
+    def __contains__(self, vlan_id):
+        index = bisect_right(self._starts, vlan_id) - 1
+        return index >= 0 and vlan_id <= self._intervals[index][1]
+
+    def __iter__(self):
+        for start, end in self._intervals:
+            yield from range(start, end + 1)
+
+    def __len__(self):
+        return sum([end - start + 1 for start, end in self._intervals])
+
+    def __bool__(self):
+        return bool(self._intervals)
+
+    def __eq__(self, other):
+        if isinstance(other, VlanSet):
+            return self._intervals == other._intervals
+        return NotImplemented
+
+    def union(self, other):
+        return VlanSet(self._intervals + other._intervals)
+
+    def intersection(self, other):
+        intervals = []
+        i = j = 0
+        while i < len(self._intervals) and j < len(other._intervals):
+            start = max(self._intervals[i][0], other._intervals[j][0])
+            end = min(self._intervals[i][1], other._intervals[j][1])
+            if start <= end:
+                intervals.append((start, end))
+            if self._intervals[i][1] < other._intervals[j][1]:
+                i += 1
+            else:
+                j += 1
+        return VlanSet(intervals)
+
+    __or__ = union
+    __and__ = intersection
+
+    def to_range_string(self):
+        return ",".join([
+            str(start) if start == end else f"{start}-{end}"
+            for start, end in self._intervals
+        ])
+
+    def intervals(self):
+        return list(self._intervals)
+
+    def to_list(self):
+        return list(self)
+
+    def to_json(self):
+        return self.to_range_string()
+
+    def __str__(self):
+        return self.to_range_string()
+
+    def __repr__(self):
+        return f"VlanSet('{self.to_range_string()}')"